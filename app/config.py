@@ -1,8 +1,16 @@
-from pydantic_settings import BaseSettings
-from pydantic import Field
-from typing import List, Dict, Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import Field, PrivateAttr, model_validator
+from typing import Callable, ClassVar, FrozenSet, List, Dict, Mapping, Optional
+from types import MappingProxyType
 from functools import lru_cache
-import json
+import re
+
+try:
+	import orjson as _json
+except ImportError:  # orjson opsiyonel; yoksa stdlib json
+	import json as _json
+
+_LEV_RE = re.compile(r"([A-Za-z0-9]+)\s*:\s*(\d+)")
 
 
 class Settings(BaseSettings):
@@ -36,20 +44,52 @@ class Settings(BaseSettings):
 	public_base_url: str = Field(default="", alias="PUBLIC_BASE_URL")
 	port: int = Field(default=8000, alias="PORT")
 	env: str = Field(default="dev", alias="ENV")
+	# Virgülle ayrılmış origin listesi; "*" tüm origin'lere izin verir
+	cors_origins_raw: str = Field(default="*", alias="CORS_ORIGINS")
+
+	# frozen: get_settings() tek, değişmez bir instance paylaştırır (thread-safe okuma)
+	model_config = SettingsConfigDict(
+		env_file=".env",
+		case_sensitive=False,
+		populate_by_name=True,
+		extra="ignore",
+		frozen=True,
+	)
+
+	# Türetilmiş değerler Settings kurulurken bir kez parse edilir; env process boyunca değişmez
+	_symbols: List[str] = PrivateAttr(default_factory=list)
+	_symbols_set: FrozenSet[str] = PrivateAttr(default_factory=frozenset)
+	_lev_map: Mapping[str, int] = PrivateAttr(default_factory=lambda: MappingProxyType({}))
+	_policy: str = PrivateAttr(default="auto")
+	_resolver: Optional[Callable[["Settings", str, Optional[int]], int]] = PrivateAttr(default=None)
 
-	class Config:
-		env_file = ".env"
-		case_sensitive = False
-		populate_by_name = True
+	@model_validator(mode="after")
+	def _parse_derived(self) -> "Settings":
+		self._symbols = self._parse_symbols_whitelist()
+		self._symbols_set = frozenset(self._symbols)
+		# Salt-okunur görünüm: çağıranlar savunmacı kopya almadan paylaşabilir
+		self._lev_map = MappingProxyType(self._parse_leverage_map())
+		# Policy sabit: normalize ve resolver seçimi dispatch başına değil, bir kez
+		self._policy = (self.leverage_policy or "auto").lower()
+		self._resolver = self._LEVERAGE_RESOLVERS.get(self._policy, Settings._resolve_auto)
+		return self
 
 	def get_symbols_whitelist(self) -> List[str]:
+		return list(self._symbols)
+
+	@property
+	def symbols_whitelist_set(self) -> FrozenSet[str]:
+		"""Üyelik kontrolleri için O(1) whitelist."""
+		return self._symbols_set
+
+	def _parse_symbols_whitelist(self) -> List[str]:
 		val = (self.symbols_whitelist_raw or "").strip()
 		if not val:
 			# Frontend defaults allow BTCUSDT and ETHUSDT; keep backend consistent
 			return ["BTCUSDT", "ETHUSDT"]
 		# try json first
 		try:
-			loaded = json.loads(val)
+			loaded = _json.loads(val)
 			if isinstance(loaded, list):
 				return [str(x).strip().upper() for x in loaded if str(x).strip()]
 		except Exception:
@@ -57,36 +97,41 @@ class Settings(BaseSettings):
 		# fallback csv
 		return [part.strip().upper() for part in val.split(",") if part.strip()]
 
-	def leverage_map(self) -> Dict[str, int]:
-		m: Dict[str, int] = {}
-		raw = (self.leverage_per_symbol_str or "").strip()
-		if not raw:
-			return m
-		for part in raw.split(","):
-			pt = part.strip()
-			if not pt:
-				continue
-			if ":" in pt:
-				k, v = pt.split(":", 1)
-				try:
-					m[k.strip().upper()] = int(v.strip())
-				except Exception:
-					continue
-		return m
+	def get_cors_origins(self) -> List[str]:
+		origins = [part.strip() for part in (self.cors_origins_raw or "").split(",") if part.strip()]
+		return origins or ["*"]
 
-	def get_leverage_for_symbol(self, symbol: str, payload_leverage: Optional[int]) -> int:
-		policy = (self.leverage_policy or "auto").lower()
-		symbol = (symbol or "").upper()
-		if policy == "webhook" and payload_leverage:
-			return int(payload_leverage)
-		if policy == "per_symbol":
-			return self.leverage_map().get(symbol, int(self.default_leverage))
-		if policy == "default":
-			return int(self.default_leverage)
-		# auto
+	def leverage_map(self) -> Mapping[str, int]:
+		return self._lev_map
+
+	def _parse_leverage_map(self) -> Dict[str, int]:
+		# "BTCUSDT:7, ETHUSDT:6" -> tek regex geçişiyle tüm çiftler
+		return {k.upper(): int(v) for k, v in _LEV_RE.findall(self.leverage_per_symbol_str or "")}
+
+	def _resolve_auto(self, symbol: str, payload_leverage: Optional[int]) -> int:
 		if payload_leverage:
 			return int(payload_leverage)
-		return self.leverage_map().get(symbol, int(self.default_leverage))
+		return self._lev_map.get(symbol, int(self.default_leverage))
+
+	def _resolve_per_symbol(self, symbol: str, payload_leverage: Optional[int]) -> int:
+		return self._lev_map.get(symbol, int(self.default_leverage))
+
+	def _resolve_default(self, symbol: str, payload_leverage: Optional[int]) -> int:
+		return int(self.default_leverage)
+
+	# policy -> resolver; "webhook" payload kaldıraç yoksa auto ile aynı davranır
+	_LEVERAGE_RESOLVERS: ClassVar[Dict[str, Callable[["Settings", str, Optional[int]], int]]] = {
+		"auto": _resolve_auto,
+		"webhook": _resolve_auto,
+		"per_symbol": _resolve_per_symbol,
+		"default": _resolve_default,
+	}
+
+	def get_leverage_for_symbol(self, symbol: str, payload_leverage: Optional[int]) -> int:
+		# Whitelist'teki semboller zaten büyük harf; yalnızca bilinmeyenler için upper()
+		if symbol not in self._symbols_set:
+			symbol = (symbol or "").upper()
+		return self._resolver(self, symbol, payload_leverage)
 
 	def get_endpoint_config(self, endpoint: str) -> Dict[str, any]:
 		"""Endpoint için varsayılan config değerlerini döndür (.env'den)"""
@@ -104,6 +149,7 @@ class Settings(BaseSettings):
 		}
 
 
-@lru_cache()
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
+	"""Process-wide Settings singleton; testler için get_settings.cache_clear() ile sıfırlanır."""
 	return Settings()
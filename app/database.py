@@ -1,16 +1,79 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from typing import AsyncIterator, Optional
 
 DATABASE_URL = "sqlite:///./data.db"
+ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./data.db"
 
 engine = create_engine(
 	DATABASE_URL,
-	connect_args={"check_same_thread": False},
-	poolclass=StaticPool,
+	# Tek paylaşılan bağlantı yerine havuz: WAL ile okuyucular paralel çalışır.
+	# timeout: yazma kilidi için busy-wait süresi (saniye)
+	# LIFO: sıcak bağlantılar yeniden kullanılır, fazlalar boşta kalıp kapanır.
+	# Yerel dosya DB'de kopan bağlantı olmaz; checkout başına pre-ping SELECT'i gereksiz.
+	connect_args={"check_same_thread": False, "timeout": 30},
+	pool_size=10,
+	max_overflow=20,
+	pool_use_lifo=True,
+	pool_pre_ping=False,
 )
 
+
+# Async handler'lar için: DB I/O event loop'u bloklamaz
+async_engine = create_async_engine(
+	ASYNC_DATABASE_URL,
+	connect_args={"check_same_thread": False, "timeout": 30},
+	pool_size=10,
+	max_overflow=20,
+	pool_use_lifo=True,
+	pool_pre_ping=False,
+)
+
+
+@event.listens_for(engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
+def _sqlite_pragmas(dbapi_conn, _record) -> None:
+	# WAL: commit başına fsync yok, okuyucular yazıcıyı beklemez
+	cur = dbapi_conn.cursor()
+	cur.execute("PRAGMA journal_mode=WAL")
+	cur.execute("PRAGMA synchronous=NORMAL")
+	cur.execute("PRAGMA temp_store=MEMORY")
+	cur.execute("PRAGMA mmap_size=268435456")
+	cur.execute("PRAGMA cache_size=-64000")
+	cur.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+
+class SessionManager:
+	"""Kısa ömürlü sync session: `with SessionManager() as db:` bloğu bitince bağlantı havuza döner.
+
+	Binance gibi ağ çağrıları bu bloğun dışında yapılmalı; session ağ I/O'su boyunca tutulmaz.
+	"""
+
+	def __init__(self) -> None:
+		self.db: Optional[Session] = None
+
+	def __enter__(self) -> Session:
+		self.db = SessionLocal()
+		return self.db
+
+	def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+		try:
+			if exc_type is not None:
+				self.db.rollback()
+		finally:
+			self.db.close()
+			self.db = None
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+	"""FastAPI dependency: istek başına bir AsyncSession."""
+	async with AsyncSessionLocal() as session:
+		yield session
 
 
 class Base(DeclarativeBase):
@@ -19,4 +82,7 @@ class Base(DeclarativeBase):
 
 def init_db() -> None:
 	from . import models  # noqa: F401
-	Base.metadata.create_all(bind=engine)
+	# Sıcak yeniden başlatmada tüm tablolar zaten var: DDL/reflection turunu atla
+	existing = set(inspect(engine).get_table_names())
+	if set(Base.metadata.tables) - existing:
+		Base.metadata.create_all(bind=engine)
@@ -1,15 +1,18 @@
-from fastapi import FastAPI, Request, WebSocket, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse, Response
+from fastapi import FastAPI, Request, WebSocket, HTTPException, Depends
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import init_db, SessionLocal
+from .database import init_db, SessionManager, AsyncSessionLocal, get_session
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from .routers import webhook
-from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime, timedelta
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from datetime import datetime, timedelta, timezone
 from .config import get_settings
-from .services.binance_client import BinanceFuturesClient
+from .services.binance_client import BinanceFuturesClient, get_shared_client, close_shared_clients
 from .services.telegram import TelegramNotifier
 # Telegram polling kaldırıldı - bot sadece mesaj gönderecek
 # from .services.telegram_commands import init_command_handler, start_polling_loop, stop_polling_loop
@@ -17,24 +20,48 @@ from . import models, schemas
 from .state import runtime
 from .services.ws_manager import ws_manager
 from .services.webhook_worker import webhook_worker_layer1, webhook_worker_layer2
+from .services.api_log_queue import api_log_batcher
 import socket
-from .services.order_sizing import get_symbol_filters, round_step
+from functools import lru_cache
+from collections import OrderedDict
+from typing import Dict, Tuple
+from contextlib import asynccontextmanager
+from .services.order_sizing import round_step
+from .services.binance_cache import cached_symbol_filters, cached_position_mode, cached_ticker_price, remember_position_mode, invalidate_on_invalid_symbol
 from .services.risk_manager import check_early_losses
 import os
+import re
 import httpx
 import asyncio
 import websockets
 import io
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+# pyplot'un global state'i yerine OO API: figür doğrudan Agg canvas'a bağlanır
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
-app = FastAPI(title="SerdarBorsa Webhook -> Binance Futures")
+
+def _utcnow() -> datetime:
+    # datetime.utcnow() deprecated; DB'deki created_at naive UTC olduğu için tzinfo düşülür
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Açılış: DB/runtime/scheduler, ardından event loop'a bağlı client'lar ve worker'lar
+    await on_startup()
+    await on_startup_async()
+    yield
+    await on_shutdown()
+
+
+app = FastAPI(title="SerdarBorsa Webhook -> Binance Futures", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # CORS middleware - Frontend'in backend'e erişebilmesi için
+# CORS_ORIGINS verilirse sabit liste (set lookup); verilmezse "*" (Render'da frontend URL'i değişebilir)
+_cors_origins = get_settings().get_cors_origins()
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Render'da frontend URL'i otomatik değişebilir
+    allow_origins=_cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -54,45 +81,59 @@ app.include_router(webhook.router)
 @app.post("/", response_model=schemas.OrderResult)
 async def root_webhook_adapter(payload: schemas.TradingViewWebhook, request: Request):
 	# Queue sistemini kullan
-	db = SessionLocal()
-	try:
+	with SessionManager() as db:
 		return await webhook.handle_tradingview(payload, request, db)
-	finally:
-		db.close()
 
 # Quick debug endpoints close to the top to verify live routes
 @app.get("/api/ping2")
 async def ping2():
-    return {"ok": True, "ts": datetime.utcnow().isoformat()}
+    return {"ok": True, "ts": _utcnow().isoformat()}
 
 @app.get("/api/debug/routes2")
 async def debug_routes2():
     return [getattr(r, "path", None) for r in app.routes]
 
-scheduler: BackgroundScheduler | None = None
+scheduler: AsyncIOScheduler | None = None
+
+
+def _get_binance_client() -> BinanceFuturesClient:
+    """Endpoint'ler için paylaşılan Binance client (get_shared_client memoize eder, shutdown'da kapanır)"""
+    settings = get_settings()
+    return get_shared_client(settings.binance_api_key, settings.binance_api_secret, settings.binance_base_url)
 
 
 # Küçük yardımcı
-def _log_binance_call(db: SessionLocal, method: str, path: str, client: BinanceFuturesClient, response_data=None, error: str | None = None):
+def _get_notifier() -> TelegramNotifier:
+    """Process boyunca tek TelegramNotifier (httpx client'ı ve TLS oturumu job'lar arasında paylaşılır)"""
+    notifier = getattr(app.state, "notifier", None)
+    if notifier is None:
+        settings = get_settings()
+        notifier = TelegramNotifier(settings.telegram_bot_token, settings.telegram_chat_id)
+        app.state.notifier = notifier
+    return notifier
+
+
+def _log_binance_call(method: str, path: str, client: BinanceFuturesClient, response_data=None, error: str | None = None):
+    # Satır queue'ya atılır; api_log_batcher toplu INSERT ile yazar (çağrı başına commit yok)
     debug = client.get_last_request_debug() if hasattr(client, 'get_last_request_debug') else None
     status = client.get_last_status_code() if hasattr(client, 'get_last_status_code') else None
-    log = models.BinanceAPILog(
-        method=method,
-        path=path,
-        url=(debug or {}).get('url') if debug else None,
-        request_params=(debug or {}).get('params') if debug else None,
-        status_code=status,
-        response=response_data if error is None else None,
-        error=error,
-    )
     try:
-        db.add(log)
-        db.commit()
+        api_log_batcher.enqueue({
+            "method": method,
+            "path": path,
+            "url": (debug or {}).get('url') if debug else None,
+            "request_params": (debug or {}).get('params') if debug else None,
+            "status_code": status,
+            "response": response_data if error is None else None,
+            "error": error,
+        })
     except Exception:
         pass
 
 
+@lru_cache(maxsize=1)
 def _lan_ip() -> str:
+    # Process boyunca sabit; UDP socket + route lookup yalnızca ilk çağrıda
     try:
         # More reliable LAN IP detection
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -101,9 +142,11 @@ def _lan_ip() -> str:
         s.close()
         return ip
     except Exception:
-        return socket.gethostbyname(socket.gethostname())
+        # DNS'e gitmeden deterministik fallback (gethostbyname yavaş DNS'te bloklayabilir)
+        return os.environ.get("HOST_LAN_IP", "127.0.0.1")
 
 
+@lru_cache(maxsize=1)
 def resolve_base_urls():
     settings = get_settings()
     lan_ip = _lan_ip()
@@ -114,6 +157,12 @@ def resolve_base_urls():
     }
 
 
+def _refresh_lan_ip() -> None:
+    _lan_ip.cache_clear()
+    resolve_base_urls.cache_clear()
+    app.state.lan_ip = _lan_ip()
+
+
 @app.websocket("/ws")
 async def ws_endpoint(ws: WebSocket):
     await ws_manager.connect(ws)
@@ -127,370 +176,406 @@ async def ws_endpoint(ws: WebSocket):
         ws_manager.disconnect(ws)
 
 
-def heartbeat_job():
-    """Her saat çalışan bot durumu mesajı (scheduler thread'inde çalışır)"""
-    async def _send():
-        settings = get_settings()
-        notifier = TelegramNotifier(settings.telegram_bot_token, settings.telegram_chat_id)
-        try:
-            timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-            await notifier.send_message(f"✅ Bot çalışıyor - {timestamp}")
-        except Exception as e:
-            print(f"[Heartbeat] Mesaj gönderilemedi: {e}")
-        finally:
-            await notifier.close()
-    
+async def heartbeat_job():
+    """Her saat çalışan bot durumu mesajı (uygulamanın event loop'unda çalışır)"""
     try:
-        asyncio.run(_send())
+        timestamp = _utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+        # Beklemeden gönder; hata send_message içinde loglanır
+        _get_notifier().send_message_nowait(f"✅ Bot çalışıyor - {timestamp}")
     except Exception as e:
-        print(f"[Heartbeat] Job error: {e}")
+        print(f"[Heartbeat] Mesaj gönderilemedi: {e}")
+
+
+# Rapor grafiğinde seri başına en fazla bu kadar nokta (1400px genişlikte fazlası görünmez)
+_CHART_POINTS = 48
+
+
+def _downsample(rows, limit: int = _CHART_POINTS):
+    """Eşit aralıklı örnekleme; ilk ve son satır her zaman korunur."""
+    n = len(rows)
+    if n <= limit:
+        return rows
+    return [rows[round(i * (n - 1) / (limit - 1))] for i in range(limit)]
 
 
-def hourly_pnl_job():
-    """Saatlik PnL raporu (scheduler thread'inde çalışır) - Layer bazlı"""
+def _render_report_chart(layer1_snaps, layer2_snaps, balance_snaps) -> io.BytesIO | None:
+    """Saatlik rapor grafiğini JPEG olarak üretir (CPU-bound; event loop dışında çalıştırılır)."""
+    graph_bio = None
+    has_layer_data = len(layer1_snaps) > 1 or len(layer2_snaps) > 1
+    has_balance_data = len(balance_snaps) > 1
+    # Alt iki grafik aynı balance serisini kullanır; saat etiketleri bir kez üretilir
+    balance_dates = [s.created_at.strftime("%H:%M") for s in balance_snaps] if has_balance_data else []
     
-    async def _run_job():
-        db = SessionLocal()
-        client = None
-        notifier = None
+    if has_layer_data or has_balance_data:
+        fig = Figure(figsize=(14, 10))
+        FigureCanvasAgg(fig)
+        axes = fig.subplots(2, 2)
+        fig.suptitle('Son 24 Saat Raporu', fontsize=14, fontweight='bold')
         
-        try:
-            settings = get_settings()
-            notifier = TelegramNotifier(settings.telegram_bot_token, settings.telegram_chat_id)
-
-            # Try to fetch real balances and positions from Binance
-            wallet = 0.0
-            available = 0.0
-            binance_positions = []
-            mark_prices = {}  # symbol -> mark_price
-            
-            if settings.binance_api_key and settings.binance_api_secret and not settings.dry_run:
-                try:
-                    async with BinanceFuturesClient(settings.binance_api_key, settings.binance_api_secret, settings.binance_base_url) as client:
-                        acct = await client.account_usdt_balances()
-                        binance_positions = await client.positions()
-                        wallet = acct.get("wallet", 0.0)
-                        available = acct.get("available", 0.0)
-                        
-                        # Mark price'ları kaydet
-                        for pos in binance_positions:
-                            symbol = pos.get("symbol")
-                            mark_price = float(pos.get("markPrice", 0.0))
-                            if symbol and mark_price > 0:
-                                mark_prices[symbol] = mark_price
-                except Exception as e:
-                    print(f"[HourlyPnL] Binance veri çekme hatası: {e}")
-
-            # Get previous data for PnL calcs
-            last_snap = db.query(models.BalanceSnapshot).order_by(models.BalanceSnapshot.id.desc()).first()
-            used = last_snap.used_allocation_usd if last_snap else 0.0
-            if wallet == 0.0:
-                wallet = last_snap.total_wallet_balance if last_snap else 100000.0
-            if available == 0.0:
-                available = wallet - used
-
-            first_snap = db.query(models.BalanceSnapshot).order_by(models.BalanceSnapshot.id.asc()).first()
-            pnl_total = (wallet - first_snap.total_wallet_balance) if first_snap else 0.0
-            pnl_1h = (wallet - last_snap.total_wallet_balance) if last_snap else 0.0
-
-            # ========== LAYER BAZLI POZİSYON ANALİZİ ==========
-            layer_data = {"layer1": {"positions": [], "pnl": 0.0, "cost": 0.0}, 
-                          "layer2": {"positions": [], "pnl": 0.0, "cost": 0.0}}
-            
-            for endpoint in ["layer1", "layer2"]:
-                endpoint_positions = db.query(models.EndpointPosition).filter_by(endpoint=endpoint).all()
-                endpoint_config = db.query(models.EndpointConfig).filter_by(endpoint=endpoint).first()
-                leverage = endpoint_config.leverage if endpoint_config else 5
+        # Sol üst: Layer 1 PnL
+        ax1 = axes[0, 0]
+        if len(layer1_snaps) > 1:
+            dates1 = [s.created_at.strftime("%H:%M") for s in layer1_snaps]
+            pnls1 = [s.unrealized_pnl for s in layer1_snaps]
+            colors1 = ['green' if p >= 0 else 'red' for p in pnls1]
+            ax1.bar(range(len(dates1)), pnls1, color=colors1, alpha=0.7)
+            ax1.axhline(y=0, color='gray', linestyle='--', linewidth=0.5)
+            ax1.set_title('Layer 1 PnL', fontweight='bold', color='blue')
+            ax1.set_ylabel('USDT')
+            if len(dates1) > 8:
+                step = len(dates1) // 8
+                ax1.set_xticks(range(0, len(dates1), step))
+                ax1.set_xticklabels(dates1[::step], rotation=45, fontsize=8)
+            else:
+                ax1.set_xticks(range(len(dates1)))
+                ax1.set_xticklabels(dates1, rotation=45, fontsize=8)
+        else:
+            ax1.text(0.5, 0.5, 'Veri yok', ha='center', va='center', transform=ax1.transAxes)
+            ax1.set_title('Layer 1 PnL', fontweight='bold', color='blue')
+        ax1.grid(True, alpha=0.3)
+        
+        # Sağ üst: Layer 2 PnL
+        ax2 = axes[0, 1]
+        if len(layer2_snaps) > 1:
+            dates2 = [s.created_at.strftime("%H:%M") for s in layer2_snaps]
+            pnls2 = [s.unrealized_pnl for s in layer2_snaps]
+            colors2 = ['green' if p >= 0 else 'red' for p in pnls2]
+            ax2.bar(range(len(dates2)), pnls2, color=colors2, alpha=0.7)
+            ax2.axhline(y=0, color='gray', linestyle='--', linewidth=0.5)
+            ax2.set_title('Layer 2 PnL', fontweight='bold', color='purple')
+            ax2.set_ylabel('USDT')
+            if len(dates2) > 8:
+                step = len(dates2) // 8
+                ax2.set_xticks(range(0, len(dates2), step))
+                ax2.set_xticklabels(dates2[::step], rotation=45, fontsize=8)
+            else:
+                ax2.set_xticks(range(len(dates2)))
+                ax2.set_xticklabels(dates2, rotation=45, fontsize=8)
+        else:
+            ax2.text(0.5, 0.5, 'Veri yok', ha='center', va='center', transform=ax2.transAxes)
+            ax2.set_title('Layer 2 PnL', fontweight='bold', color='purple')
+        ax2.grid(True, alpha=0.3)
+        
+        # Sol alt: Toplam Unrealized PnL
+        ax3 = axes[1, 0]
+        if has_balance_data:
+            dates3 = balance_dates
+            total_pnls = [s.unrealized_pnl if s.unrealized_pnl else 0 for s in balance_snaps]
+            colors3 = ['green' if p >= 0 else 'red' for p in total_pnls]
+            ax3.bar(range(len(dates3)), total_pnls, color=colors3, alpha=0.7)
+            ax3.axhline(y=0, color='gray', linestyle='--', linewidth=0.5)
+            ax3.set_title('Toplam Unrealized PnL', fontweight='bold')
+            ax3.set_ylabel('USDT')
+            if len(dates3) > 8:
+                step = len(dates3) // 8
+                ax3.set_xticks(range(0, len(dates3), step))
+                ax3.set_xticklabels(dates3[::step], rotation=45, fontsize=8)
+            else:
+                ax3.set_xticks(range(len(dates3)))
+                ax3.set_xticklabels(dates3, rotation=45, fontsize=8)
+        else:
+            ax3.text(0.5, 0.5, 'Veri yok', ha='center', va='center', transform=ax3.transAxes)
+            ax3.set_title('Toplam Unrealized PnL', fontweight='bold')
+        ax3.grid(True, alpha=0.3)
+        
+        # Sağ alt: Equity (Şu an kapanırsa)
+        ax4 = axes[1, 1]
+        if has_balance_data:
+            dates4 = balance_dates
+            equities = [s.total_equity if s.total_equity else s.total_wallet_balance for s in balance_snaps]
+            ax4.plot(range(len(dates4)), equities, marker='o', linestyle='-', color='gold', markersize=4)
+            ax4.fill_between(range(len(dates4)), equities, alpha=0.3, color='gold')
+            ax4.set_title('Tahmini Bakiye (Şu an kapanırsa)', fontweight='bold')
+            ax4.set_ylabel('USDT')
+            if len(dates4) > 8:
+                step = len(dates4) // 8
+                ax4.set_xticks(range(0, len(dates4), step))
+                ax4.set_xticklabels(dates4[::step], rotation=45, fontsize=8)
+            else:
+                ax4.set_xticks(range(len(dates4)))
+                ax4.set_xticklabels(dates4, rotation=45, fontsize=8)
+        else:
+            ax4.text(0.5, 0.5, 'Veri yok', ha='center', va='center', transform=ax4.transAxes)
+            ax4.set_title('Tahmini Bakiye (Şu an kapanırsa)', fontweight='bold')
+        ax4.grid(True, alpha=0.3)
+        
+        fig.tight_layout()
+        
+        graph_bio = io.BytesIO()
+        # JPEG (Pillow): PNG/zlib'e göre daha hızlı encode ve daha küçük upload; bar grafikleri için yeterli
+        fig.savefig(graph_bio, format='jpeg', dpi=100, pil_kwargs={'quality': 85, 'optimize': False})
+        graph_bio.seek(0)
+    return graph_bio
+
+
+# hourly_pnl_job: ilk BalanceSnapshot'ın bakiyesi (process boyunca sabit)
+_first_snapshot_wallet: float | None = None
+
+
+async def hourly_pnl_job():
+    """Saatlik PnL raporu (uygulamanın event loop'unda çalışır) - Layer bazlı"""
+    db = None
+    client = None
+    
+    try:
+        settings = get_settings()
+        notifier = _get_notifier()
+
+        # Try to fetch real balances and positions from Binance
+        wallet = 0.0
+        available = 0.0
+        binance_positions = []
+        mark_prices = {}  # symbol -> mark_price
+        
+        if settings.binance_api_key and settings.binance_api_secret and not settings.dry_run:
+            try:
+                client = _get_binance_client()
+                acct = await client.account_usdt_balances()
+                binance_positions = await client.positions()
+                wallet = acct.get("wallet", 0.0)
+                available = acct.get("available", 0.0)
                 
-                for ep_pos in endpoint_positions:
-                    if ep_pos.qty == 0:
-                        continue
-                    
-                    symbol = ep_pos.symbol
-                    side = ep_pos.side
-                    qty = ep_pos.qty
-                    entry_price = ep_pos.entry_price or 0
-                    mark_price = mark_prices.get(symbol, entry_price)  # Binance'den mark price
-                    
-                    # PnL hesapla
-                    if side == "LONG":
-                        unrealized_pnl = (mark_price - entry_price) * qty
-                    else:  # SHORT
-                        unrealized_pnl = (entry_price - mark_price) * qty
-                    
-                    # Maliyet (marjin)
-                    cost = (entry_price * qty) / leverage if leverage > 0 else 0
-                    roe_pct = (unrealized_pnl / cost) * 100 if cost > 0 else 0.0
-                    
-                    layer_data[endpoint]["positions"].append({
-                        "symbol": symbol,
-                        "side": side,
-                        "qty": qty,
-                        "entry_price": entry_price,
-                        "mark_price": mark_price,
-                        "pnl": unrealized_pnl,
-                        "cost": cost,
-                        "roe_pct": roe_pct,
-                        "leverage": leverage
-                    })
-                    layer_data[endpoint]["pnl"] += unrealized_pnl
-                    layer_data[endpoint]["cost"] += cost
-
-            # Toplam hesapla
-            total_layer_pnl = layer_data["layer1"]["pnl"] + layer_data["layer2"]["pnl"]
-            total_layer_cost = layer_data["layer1"]["cost"] + layer_data["layer2"]["cost"]
+                # Mark price'ları kaydet
+                for pos in binance_positions:
+                    symbol = pos.get("symbol")
+                    mark_price = float(pos.get("markPrice", 0.0))
+                    if symbol and mark_price > 0:
+                        mark_prices[symbol] = mark_price
+            except Exception as e:
+                print(f"[HourlyPnL] Binance veri çekme hatası: {e}")
+
+        # Session Binance çağrıları bittikten sonra açılır
+        db = AsyncSessionLocal()
+
+        # Get previous data for PnL calcs
+        # Satır yerine yalnızca gereken üç değer tek sorguda (scalar subquery'ler)
+        global _first_snapshot_wallet
+        Snap = models.BalanceSnapshot
+        cols = [
+            select(Snap.total_wallet_balance).order_by(Snap.id.desc()).limit(1).scalar_subquery().label("last_bal"),
+            select(Snap.used_allocation_usd).order_by(Snap.id.desc()).limit(1).scalar_subquery().label("last_used"),
+        ]
+        # İlk snapshot hiç değişmez (tablo yalnızca eklemeyle büyür); bulunduktan sonra tekrar sorgulanmaz
+        if _first_snapshot_wallet is None:
+            cols.append(select(Snap.total_wallet_balance).order_by(Snap.id.asc()).limit(1).scalar_subquery().label("first_bal"))
+        edge = (await db.execute(select(*cols))).one()
+        if _first_snapshot_wallet is None:
+            _first_snapshot_wallet = edge.first_bal
+        has_snap = edge.last_bal is not None
+        used = (edge.last_used or 0.0) if has_snap else 0.0
+        if wallet == 0.0:
+            wallet = edge.last_bal if has_snap else 100000.0
+        if available == 0.0:
+            available = wallet - used
+
+        pnl_total = (wallet - _first_snapshot_wallet) if _first_snapshot_wallet is not None else 0.0
+        pnl_1h = (wallet - edge.last_bal) if has_snap else 0.0
+
+        # ========== LAYER BAZLI POZİSYON ANALİZİ ==========
+        layer_data = {"layer1": {"positions": [], "pnl": 0.0, "cost": 0.0}, 
+                      "layer2": {"positions": [], "pnl": 0.0, "cost": 0.0}}
+        
+        # İki layer'ın pozisyonları ve leverage'ları tek JOIN sorgusunda (config yoksa leverage=5)
+        Pos, Cfg = models.EndpointPosition, models.EndpointConfig
+        pos_rows = (await db.execute(
+            select(Pos, Cfg.leverage)
+            .outerjoin(Cfg, Cfg.endpoint == Pos.endpoint)
+            .where(Pos.endpoint.in_(("layer1", "layer2")), Pos.qty != 0)
+            .order_by(Pos.id)
+        )).all()
+        
+        for ep_pos, cfg_leverage in pos_rows:
+            endpoint = ep_pos.endpoint
+            leverage = cfg_leverage if cfg_leverage is not None else 5
             
-            # ========== MESAJ OLUŞTUR ==========
-            msg = (
-                f"📊 <b>Saatlik Rapor</b>\n\n"
-                f"💵 <b>Wallet:</b> {wallet:.2f} USDT\n"
-                f"💰 <b>Available:</b> {available:.2f} USDT\n"
-                f"🔒 <b>Used:</b> {used:.2f} USDT\n"
-                f"📈 <b>PNL 1h:</b> {pnl_1h:.2f} USDT\n"
-                f"📈 <b>PNL Total:</b> {pnl_total:.2f} USDT\n"
-            )
+            symbol = ep_pos.symbol
+            side = ep_pos.side
+            qty = ep_pos.qty
+            entry_price = ep_pos.entry_price or 0
+            mark_price = mark_prices.get(symbol, entry_price)  # Binance'den mark price
             
-            # Layer 1 Pozisyonları
-            msg += f"\n{'='*30}\n"
-            msg += f"🔵 <b>LAYER 1 (/tradingview)</b>\n"
-            if layer_data["layer1"]["positions"]:
-                for pos in layer_data["layer1"]["positions"]:
-                    pnl_emoji = "🟢" if pos["pnl"] >= 0 else "🔴"
-                    msg += (
-                        f"\n<b>{pos['symbol']}</b> ({pos['side']})\n"
-                        f"Giriş: {pos['entry_price']:.4f} | Mark: {pos['mark_price']:.4f}\n"
-                        f"Miktar: {pos['qty']:.6f} | Lev: {pos['leverage']}x\n"
-                        f"{pnl_emoji} Kâr: ${pos['pnl']:.2f} ({pos['roe_pct']:.1f}%)\n"
-                    )
-                l1_pnl = layer_data["layer1"]["pnl"]
-                l1_emoji = "🟢" if l1_pnl >= 0 else "🔴"
-                msg += f"\n{l1_emoji} <b>Layer1 Toplam:</b> ${l1_pnl:.2f}\n"
-            else:
-                msg += "📭 Açık pozisyon yok\n"
+            # PnL hesapla
+            if side == "LONG":
+                unrealized_pnl = (mark_price - entry_price) * qty
+            else:  # SHORT
+                unrealized_pnl = (entry_price - mark_price) * qty
             
-            # Layer 2 Pozisyonları
-            msg += f"\n{'='*30}\n"
-            msg += f"🟣 <b>LAYER 2 (/signal2)</b>\n"
-            if layer_data["layer2"]["positions"]:
-                for pos in layer_data["layer2"]["positions"]:
-                    pnl_emoji = "🟢" if pos["pnl"] >= 0 else "🔴"
-                    msg += (
-                        f"\n<b>{pos['symbol']}</b> ({pos['side']})\n"
-                        f"Giriş: {pos['entry_price']:.4f} | Mark: {pos['mark_price']:.4f}\n"
-                        f"Miktar: {pos['qty']:.6f} | Lev: {pos['leverage']}x\n"
-                        f"{pnl_emoji} Kâr: ${pos['pnl']:.2f} ({pos['roe_pct']:.1f}%)\n"
-                    )
-                l2_pnl = layer_data["layer2"]["pnl"]
-                l2_emoji = "🟢" if l2_pnl >= 0 else "🔴"
-                msg += f"\n{l2_emoji} <b>Layer2 Toplam:</b> ${l2_pnl:.2f}\n"
-            else:
-                msg += "📭 Açık pozisyon yok\n"
+            # Maliyet (marjin)
+            cost = (entry_price * qty) / leverage if leverage > 0 else 0
+            roe_pct = (unrealized_pnl / cost) * 100 if cost > 0 else 0.0
             
-            # Genel Toplam
-            msg += f"\n{'='*30}\n"
-            total_emoji = "🟢" if total_layer_pnl >= 0 else "🔴"
-            estimated_balance = wallet + total_layer_pnl
-            msg += (
-                f"💎 <b>TOPLAM</b>\n"
-                f"{total_emoji} <b>Unrealized PnL:</b> ${total_layer_pnl:.2f}\n"
-                f"💰 <b>Şu an kapanırsa:</b> {estimated_balance:.2f} USDT\n"
-            )
-
-            # ========== SNAPSHOT KAYDET ==========
-            # Ana snapshot
-            db.add(models.BalanceSnapshot(
-                total_wallet_balance=wallet,
-                available_balance=available,
-                used_allocation_usd=used,
-                total_equity=estimated_balance,
-                unrealized_pnl=total_layer_pnl,
-                note=f"Hourly snapshot {datetime.utcnow().isoformat()}Z",
+            layer_data[endpoint]["positions"].append({
+                "symbol": symbol,
+                "side": side,
+                "qty": qty,
+                "entry_price": entry_price,
+                "mark_price": mark_price,
+                "pnl": unrealized_pnl,
+                "cost": cost,
+                "roe_pct": roe_pct,
+                "leverage": leverage
+            })
+            layer_data[endpoint]["pnl"] += unrealized_pnl
+            layer_data[endpoint]["cost"] += cost
+
+        # Toplam hesapla
+        total_layer_pnl = layer_data["layer1"]["pnl"] + layer_data["layer2"]["pnl"]
+        total_layer_cost = layer_data["layer1"]["cost"] + layer_data["layer2"]["cost"]
+        
+        # ========== MESAJ OLUŞTUR ==========
+        msg = (
+            f"📊 <b>Saatlik Rapor</b>\n\n"
+            f"💵 <b>Wallet:</b> {wallet:.2f} USDT\n"
+            f"💰 <b>Available:</b> {available:.2f} USDT\n"
+            f"🔒 <b>Used:</b> {used:.2f} USDT\n"
+            f"📈 <b>PNL 1h:</b> {pnl_1h:.2f} USDT\n"
+            f"📈 <b>PNL Total:</b> {pnl_total:.2f} USDT\n"
+        )
+        
+        # Layer 1 Pozisyonları
+        msg += f"\n{'='*30}\n"
+        msg += f"🔵 <b>LAYER 1 (/tradingview)</b>\n"
+        if layer_data["layer1"]["positions"]:
+            for pos in layer_data["layer1"]["positions"]:
+                pnl_emoji = "🟢" if pos["pnl"] >= 0 else "🔴"
+                msg += (
+                    f"\n<b>{pos['symbol']}</b> ({pos['side']})\n"
+                    f"Giriş: {pos['entry_price']:.4f} | Mark: {pos['mark_price']:.4f}\n"
+                    f"Miktar: {pos['qty']:.6f} | Lev: {pos['leverage']}x\n"
+                    f"{pnl_emoji} Kâr: ${pos['pnl']:.2f} ({pos['roe_pct']:.1f}%)\n"
+                )
+            l1_pnl = layer_data["layer1"]["pnl"]
+            l1_emoji = "🟢" if l1_pnl >= 0 else "🔴"
+            msg += f"\n{l1_emoji} <b>Layer1 Toplam:</b> ${l1_pnl:.2f}\n"
+        else:
+            msg += "📭 Açık pozisyon yok\n"
+        
+        # Layer 2 Pozisyonları
+        msg += f"\n{'='*30}\n"
+        msg += f"🟣 <b>LAYER 2 (/signal2)</b>\n"
+        if layer_data["layer2"]["positions"]:
+            for pos in layer_data["layer2"]["positions"]:
+                pnl_emoji = "🟢" if pos["pnl"] >= 0 else "🔴"
+                msg += (
+                    f"\n<b>{pos['symbol']}</b> ({pos['side']})\n"
+                    f"Giriş: {pos['entry_price']:.4f} | Mark: {pos['mark_price']:.4f}\n"
+                    f"Miktar: {pos['qty']:.6f} | Lev: {pos['leverage']}x\n"
+                    f"{pnl_emoji} Kâr: ${pos['pnl']:.2f} ({pos['roe_pct']:.1f}%)\n"
+                )
+            l2_pnl = layer_data["layer2"]["pnl"]
+            l2_emoji = "🟢" if l2_pnl >= 0 else "🔴"
+            msg += f"\n{l2_emoji} <b>Layer2 Toplam:</b> ${l2_pnl:.2f}\n"
+        else:
+            msg += "📭 Açık pozisyon yok\n"
+        
+        # Genel Toplam
+        msg += f"\n{'='*30}\n"
+        total_emoji = "🟢" if total_layer_pnl >= 0 else "🔴"
+        estimated_balance = wallet + total_layer_pnl
+        msg += (
+            f"💎 <b>TOPLAM</b>\n"
+            f"{total_emoji} <b>Unrealized PnL:</b> ${total_layer_pnl:.2f}\n"
+            f"💰 <b>Şu an kapanırsa:</b> {estimated_balance:.2f} USDT\n"
+        )
+
+        # ========== SNAPSHOT KAYDET ==========
+        # Ana snapshot
+        db.add(models.BalanceSnapshot(
+            total_wallet_balance=wallet,
+            available_balance=available,
+            used_allocation_usd=used,
+            total_equity=estimated_balance,
+            unrealized_pnl=total_layer_pnl,
+            note=f"Hourly snapshot {_utcnow().isoformat()}Z",
+        ))
+        
+        # Layer bazlı snapshot'lar
+        for endpoint in ["layer1", "layer2"]:
+            db.add(models.LayerSnapshot(
+                endpoint=endpoint,
+                unrealized_pnl=layer_data[endpoint]["pnl"],
+                total_cost=layer_data[endpoint]["cost"],
+                position_count=len(layer_data[endpoint]["positions"])
             ))
+        
+        await db.commit()
+
+        # ========== GRAFİKLER OLUŞTUR ==========
+        graph_bio = None
+        try:
+            end_time = _utcnow()
+            start_time = end_time - timedelta(hours=24)
             
-            # Layer bazlı snapshot'lar
-            for endpoint in ["layer1", "layer2"]:
-                db.add(models.LayerSnapshot(
-                    endpoint=endpoint,
-                    unrealized_pnl=layer_data[endpoint]["pnl"],
-                    total_cost=layer_data[endpoint]["cost"],
-                    position_count=len(layer_data[endpoint]["positions"])
-                ))
+            # Son 24 saat için iki layer'ın snapshot'ları tek sorguda, Python'da ayrılır
+            layer_snaps = (await db.execute(select(models.LayerSnapshot).filter(
+                models.LayerSnapshot.endpoint.in_(("layer1", "layer2")),
+                models.LayerSnapshot.created_at >= start_time
+            ).order_by(models.LayerSnapshot.created_at.asc()))).scalars().all()
+            layer1_snaps = _downsample([s for s in layer_snaps if s.endpoint == "layer1"])
+            layer2_snaps = _downsample([s for s in layer_snaps if s.endpoint == "layer2"])
             
-            db.commit()
-
-            # ========== GRAFİKLER OLUŞTUR ==========
-            graph_bio = None
-            try:
-                end_time = datetime.utcnow()
-                start_time = end_time - timedelta(hours=24)
-                
-                # Son 24 saat için layer snapshot'larını çek
-                layer1_snaps = db.query(models.LayerSnapshot).filter(
-                    models.LayerSnapshot.endpoint == "layer1",
-                    models.LayerSnapshot.created_at >= start_time
-                ).order_by(models.LayerSnapshot.created_at.asc()).all()
-                
-                layer2_snaps = db.query(models.LayerSnapshot).filter(
-                    models.LayerSnapshot.endpoint == "layer2",
-                    models.LayerSnapshot.created_at >= start_time
-                ).order_by(models.LayerSnapshot.created_at.asc()).all()
-                
-                # Ana balance snapshot'larını çek
-                balance_snaps = db.query(models.BalanceSnapshot).filter(
-                    models.BalanceSnapshot.created_at >= start_time
-                ).order_by(models.BalanceSnapshot.created_at.asc()).all()
-                
-                has_layer_data = len(layer1_snaps) > 1 or len(layer2_snaps) > 1
-                has_balance_data = len(balance_snaps) > 1
+            # Ana balance snapshot'larını çek
+            # Webhook'lar da her emirde snapshot yazar; grafikte en fazla _CHART_POINTS nokta
+            balance_snaps = _downsample((await db.execute(select(models.BalanceSnapshot).filter(
+                models.BalanceSnapshot.created_at >= start_time
+            ).order_by(models.BalanceSnapshot.created_at.asc()))).scalars().all())
+            
+            # DB işi bitti: render ve Telegram upload'ı sürerken bağlantı havuza dönsün
+            await db.close()
+            db = None
+            
+            # matplotlib render'ı thread'de; event loop webhook/WS isteklerine hizmet etmeye devam eder
+            graph_bio = await asyncio.to_thread(_render_report_chart, layer1_snaps, layer2_snaps, balance_snaps)
                 
-                if has_layer_data or has_balance_data:
-                    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
-                    fig.suptitle('Son 24 Saat Raporu', fontsize=14, fontweight='bold')
-                    
-                    # Sol üst: Layer 1 PnL
-                    ax1 = axes[0, 0]
-                    if len(layer1_snaps) > 1:
-                        dates1 = [s.created_at.strftime("%H:%M") for s in layer1_snaps]
-                        pnls1 = [s.unrealized_pnl for s in layer1_snaps]
-                        colors1 = ['green' if p >= 0 else 'red' for p in pnls1]
-                        ax1.bar(range(len(dates1)), pnls1, color=colors1, alpha=0.7)
-                        ax1.axhline(y=0, color='gray', linestyle='--', linewidth=0.5)
-                        ax1.set_title('Layer 1 PnL', fontweight='bold', color='blue')
-                        ax1.set_ylabel('USDT')
-                        if len(dates1) > 8:
-                            step = len(dates1) // 8
-                            ax1.set_xticks(range(0, len(dates1), step))
-                            ax1.set_xticklabels(dates1[::step], rotation=45, fontsize=8)
-                        else:
-                            ax1.set_xticks(range(len(dates1)))
-                            ax1.set_xticklabels(dates1, rotation=45, fontsize=8)
-                    else:
-                        ax1.text(0.5, 0.5, 'Veri yok', ha='center', va='center', transform=ax1.transAxes)
-                        ax1.set_title('Layer 1 PnL', fontweight='bold', color='blue')
-                    ax1.grid(True, alpha=0.3)
-                    
-                    # Sağ üst: Layer 2 PnL
-                    ax2 = axes[0, 1]
-                    if len(layer2_snaps) > 1:
-                        dates2 = [s.created_at.strftime("%H:%M") for s in layer2_snaps]
-                        pnls2 = [s.unrealized_pnl for s in layer2_snaps]
-                        colors2 = ['green' if p >= 0 else 'red' for p in pnls2]
-                        ax2.bar(range(len(dates2)), pnls2, color=colors2, alpha=0.7)
-                        ax2.axhline(y=0, color='gray', linestyle='--', linewidth=0.5)
-                        ax2.set_title('Layer 2 PnL', fontweight='bold', color='purple')
-                        ax2.set_ylabel('USDT')
-                        if len(dates2) > 8:
-                            step = len(dates2) // 8
-                            ax2.set_xticks(range(0, len(dates2), step))
-                            ax2.set_xticklabels(dates2[::step], rotation=45, fontsize=8)
-                        else:
-                            ax2.set_xticks(range(len(dates2)))
-                            ax2.set_xticklabels(dates2, rotation=45, fontsize=8)
-                    else:
-                        ax2.text(0.5, 0.5, 'Veri yok', ha='center', va='center', transform=ax2.transAxes)
-                        ax2.set_title('Layer 2 PnL', fontweight='bold', color='purple')
-                    ax2.grid(True, alpha=0.3)
-                    
-                    # Sol alt: Toplam Unrealized PnL
-                    ax3 = axes[1, 0]
-                    if has_balance_data:
-                        dates3 = [s.created_at.strftime("%H:%M") for s in balance_snaps]
-                        total_pnls = [s.unrealized_pnl if s.unrealized_pnl else 0 for s in balance_snaps]
-                        colors3 = ['green' if p >= 0 else 'red' for p in total_pnls]
-                        ax3.bar(range(len(dates3)), total_pnls, color=colors3, alpha=0.7)
-                        ax3.axhline(y=0, color='gray', linestyle='--', linewidth=0.5)
-                        ax3.set_title('Toplam Unrealized PnL', fontweight='bold')
-                        ax3.set_ylabel('USDT')
-                        if len(dates3) > 8:
-                            step = len(dates3) // 8
-                            ax3.set_xticks(range(0, len(dates3), step))
-                            ax3.set_xticklabels(dates3[::step], rotation=45, fontsize=8)
-                        else:
-                            ax3.set_xticks(range(len(dates3)))
-                            ax3.set_xticklabels(dates3, rotation=45, fontsize=8)
-                    else:
-                        ax3.text(0.5, 0.5, 'Veri yok', ha='center', va='center', transform=ax3.transAxes)
-                        ax3.set_title('Toplam Unrealized PnL', fontweight='bold')
-                    ax3.grid(True, alpha=0.3)
-                    
-                    # Sağ alt: Equity (Şu an kapanırsa)
-                    ax4 = axes[1, 1]
-                    if has_balance_data:
-                        dates4 = [s.created_at.strftime("%H:%M") for s in balance_snaps]
-                        equities = [s.total_equity if s.total_equity else s.total_wallet_balance for s in balance_snaps]
-                        ax4.plot(range(len(dates4)), equities, marker='o', linestyle='-', color='gold', markersize=4)
-                        ax4.fill_between(range(len(dates4)), equities, alpha=0.3, color='gold')
-                        ax4.set_title('Tahmini Bakiye (Şu an kapanırsa)', fontweight='bold')
-                        ax4.set_ylabel('USDT')
-                        if len(dates4) > 8:
-                            step = len(dates4) // 8
-                            ax4.set_xticks(range(0, len(dates4), step))
-                            ax4.set_xticklabels(dates4[::step], rotation=45, fontsize=8)
-                        else:
-                            ax4.set_xticks(range(len(dates4)))
-                            ax4.set_xticklabels(dates4, rotation=45, fontsize=8)
-                    else:
-                        ax4.text(0.5, 0.5, 'Veri yok', ha='center', va='center', transform=ax4.transAxes)
-                        ax4.set_title('Tahmini Bakiye (Şu an kapanırsa)', fontweight='bold')
-                    ax4.grid(True, alpha=0.3)
-                    
-                    plt.tight_layout()
-                    
-                    graph_bio = io.BytesIO()
-                    plt.savefig(graph_bio, format='png', dpi=100)
-                    graph_bio.seek(0)
-                    plt.close()
-                    
-            except Exception as e:
-                print(f"[HourlyPnL] Grafik oluşturma hatası: {e}")
-                import traceback
-                traceback.print_exc()
-
-            # ========== TELEGRAM'A GÖNDER ==========
-            try:
-                if graph_bio:
-                    await notifier.send_photo(graph_bio, caption=msg)
-                else:
-                    await notifier.send_message(msg)
-            except Exception as e:
-                print(f"[HourlyPnL] Telegram gönderme hatası: {e}")
-
         except Exception as e:
-            print(f"[HourlyPnL] Job error: {e}")
+            print(f"[HourlyPnL] Grafik oluşturma hatası: {e}")
             import traceback
             traceback.print_exc()
-        finally:
-            if notifier:
-                await notifier.close()
-            db.close()
-    
-    try:
-        asyncio.run(_run_job())
+
+        # ========== TELEGRAM'A GÖNDER ==========
+        # Grafik adımı hata verdiyse session hâlâ açık olabilir; upload'tan önce kapat
+        if db is not None:
+            await db.close()
+            db = None
+        try:
+            if graph_bio:
+                await notifier.send_photo(graph_bio, caption=msg, filename="chart.jpg", mime_type="image/jpeg")
+            else:
+                await notifier.send_message(msg)
+        except Exception as e:
+            print(f"[HourlyPnL] Telegram gönderme hatası: {e}")
+
     except Exception as e:
-        print(f"[HourlyPnL] asyncio.run error: {e}")
+        print(f"[HourlyPnL] Job error: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        if db is not None:
+            await db.close()
 
 
-@app.on_event("startup")
-def on_startup():
+async def on_startup():
     init_db()
     # initialize runtime config: try DB first, fallback to .env settings
     settings = get_settings()
-    db = SessionLocal()
-    try:
+    with SessionManager() as db:
         if not runtime.load_from_db(db):
             # DB'de ayar yoksa veya hata olursa .env'den yükle
             print("[Startup] DB'de runtime ayarı bulunamadı, .env'den yükleniyor...")
             runtime.reset_from_settings(settings)
-    finally:
-        db.close()
     app.state.public_base_url = settings.public_base_url or ""
+    # LAN IP'yi açılışta bir kez çöz; dashboard istekleri socket/DNS çağrısı yapmaz
+    app.state.lan_ip = _lan_ip()
     
     global scheduler
-    scheduler = BackgroundScheduler()
+    # Job'lar uygulamanın event loop'unda çalışır; paylaşılan client ve async session havuzunu kullanır
+    scheduler = AsyncIOScheduler()
     # Her saat bot durumu mesajı
     scheduler.add_job(heartbeat_job, "interval", hours=1, id="heartbeat_job", replace_existing=True)
     # Saatlik PnL raporu
     scheduler.add_job(hourly_pnl_job, "interval", hours=1, id="hourly_pnl_job", replace_existing=True)
+    # LAN IP cache'ini saatte bir tazele (DHCP/ağ değişikliği olursa)
+    scheduler.add_job(_refresh_lan_ip, "interval", hours=1, id="refresh_lan_ip", replace_existing=True)
     # Erken zarar kesme kontrolü (Her 15 dk) - Şimdilik pasif
     # scheduler.add_job(check_early_losses, "interval", minutes=15, id="check_early_losses_job", replace_existing=True)
     
@@ -502,20 +587,21 @@ def on_startup():
     scheduler.start()
 
     # Debug: print registered routes and openapi paths on startup
-    try:
-        paths = [getattr(r, "path", None) for r in app.routes]
-        print("[Startup] Registered routes:", paths)
-        openapi_paths = list((app.openapi() or {}).get("paths", {}).keys())
-        print("[Startup] OpenAPI paths:", openapi_paths)
-        print("[Startup] Has /api/binance/price?", "/api/binance/price" in openapi_paths, "/api/binance/price" in paths)
-        print("[Startup] Has /api/debug/routes?", "/api/debug/routes" in openapi_paths, "/api/debug/routes" in paths)
-        print("[Startup] Has /api/debug/routes2?", "/api/debug/routes2" in openapi_paths, "/api/debug/routes2" in paths)
-        print("[Startup] Has /api/ping2?", "/api/ping2" in openapi_paths, "/api/ping2" in paths)
-    except Exception as e:
-        print("[Startup] Route/OpenAPI debug error:", e)
+    # Şema üretimi her restart'ta maliyetli; yalnızca DEBUG_ROUTES set edilmişse çalışır
+    if os.getenv("DEBUG_ROUTES"):
+        try:
+            paths = [getattr(r, "path", None) for r in app.routes]
+            print("[Startup] Registered routes:", paths)
+            openapi_paths = list((app.openapi() or {}).get("paths", {}).keys())
+            print("[Startup] OpenAPI paths:", openapi_paths)
+            print("[Startup] Has /api/binance/price?", "/api/binance/price" in openapi_paths, "/api/binance/price" in paths)
+            print("[Startup] Has /api/debug/routes?", "/api/debug/routes" in openapi_paths, "/api/debug/routes" in paths)
+            print("[Startup] Has /api/debug/routes2?", "/api/debug/routes2" in openapi_paths, "/api/debug/routes2" in paths)
+            print("[Startup] Has /api/ping2?", "/api/ping2" in openapi_paths, "/api/ping2" in paths)
+        except Exception as e:
+            print("[Startup] Route/OpenAPI debug error:", e)
 
 
-@app.on_event("shutdown")
 async def on_shutdown():
     global scheduler
     # Webhook worker'ları durdur
@@ -535,12 +621,29 @@ async def on_shutdown():
     # await stop_polling_loop()
     if scheduler:
         scheduler.shutdown(wait=False)
+    try:
+        await api_log_batcher.stop()
+    except Exception as e:
+        print(f"[Shutdown] API log flusher durdurma hatası: {e}")
+    await close_shared_clients()
+    notifier = getattr(app.state, "notifier", None)
+    if notifier is not None:
+        await notifier.close()
+        app.state.notifier = None
+    streamlit_client = getattr(app.state, "streamlit_client", None)
+    if streamlit_client is not None:
+        await streamlit_client.aclose()
+        app.state.streamlit_client = None
 
 
 # Async startup işlemleri (event loop hazır olduğunda)
-@app.on_event("startup")
 async def on_startup_async():
     settings = get_settings()
+    # Paylaşılan Binance client'ı uygulamanın event loop'unda oluştur
+    _get_binance_client()
+    # Streamlit proxy client'ı da ilk istekten önce hazır olsun
+    _get_streamlit_client()
+    await api_log_batcher.start()
     
     # Webhook worker'ları başlat (Layer1 ve Layer2)
     try:
@@ -558,53 +661,37 @@ async def on_startup_async():
     # Ensure One-way mode on startup when live
     if settings.binance_api_key and settings.binance_api_secret and not settings.dry_run:
         try:
-            async with BinanceFuturesClient(settings.binance_api_key, settings.binance_api_secret, settings.binance_base_url) as client:
-                try:
-                    pm = await client.position_mode()
-                    if bool(pm.get("dualSidePosition")):
-                        resp = await client.set_position_mode(dual=False)
-                        # Log to DB
-                        db = SessionLocal()
-                        try:
-                            _log_binance_call(db, "POST", "/fapi/v1/positionSide/dual", client, response_data=resp)
-                        except Exception:
-                            pass
-                        finally:
-                            db.close()
-                        print("[Startup] Position mode One-way olarak ayarlandı")
-                except Exception as e:
-                    # Log error but do not prevent startup
-                    db = SessionLocal()
-                    try:
-                        _log_binance_call(db, "POST", "/fapi/v1/positionSide/dual", client, error=str(e))
-                    except Exception:
-                        pass
-                    finally:
-                        db.close()
-                    print(f"[Startup] Position mode check error: {e}")
+            client = _get_binance_client()
+            try:
+                pm = await cached_position_mode(client)
+                if bool(pm.get("dualSidePosition")):
+                    resp = await client.set_position_mode(dual=False)
+                    remember_position_mode(client, False)
+                    # Log to DB
+                    _log_binance_call("POST", "/fapi/v1/positionSide/dual", client, response_data=resp)
+                    print("[Startup] Position mode One-way olarak ayarlandı")
+            except Exception as e:
+                # Log error but do not prevent startup
+                _log_binance_call("POST", "/fapi/v1/positionSide/dual", client, error=str(e))
+                print(f"[Startup] Position mode check error: {e}")
         except Exception as e:
             print(f"[Startup] Binance client error: {e}")
     
     # Bot başlatıldığında hemen test mesajı gönder
     if settings.telegram_bot_token and settings.telegram_chat_id:
-        notifier = TelegramNotifier(settings.telegram_bot_token, settings.telegram_chat_id)
         try:
-            await notifier.send_message("🚀 Bot başlatıldı ve çalışıyor!\n\n📡 Aktif Endpoint'ler:\n- Layer1: /webhook/tradingview\n- Layer2: /webhook/signal2")
-            print("[Startup] Telegram başlangıç mesajı gönderildi")
+            # Startup Telegram round-trip'ini beklemez
+            _get_notifier().send_message_nowait("🚀 Bot başlatıldı ve çalışıyor!\n\n📡 Aktif Endpoint'ler:\n- Layer1: /webhook/tradingview\n- Layer2: /webhook/signal2")
+            print("[Startup] Telegram başlangıç mesajı kuyruğa alındı")
         except Exception as e:
             print(f"[Startup] Telegram test mesajı gönderilemedi: {e}")
-        finally:
-            await notifier.close()
         
         # İlk raporu gönder (5 saniye bekle, servislerin hazır olmasını sağla)
         async def send_initial_report():
             await asyncio.sleep(5)
             print("[Startup] İlk rapor gönderiliyor...")
             try:
-                # hourly_pnl_job'u thread'de çalıştır (senkron fonksiyon)
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    executor.submit(hourly_pnl_job)
+                await hourly_pnl_job()
                 print("[Startup] İlk rapor gönderildi")
             except Exception as e:
                 print(f"[Startup] İlk rapor gönderme hatası: {e}")
@@ -615,21 +702,85 @@ async def on_startup_async():
 # Streamlit proxy — tek servis altında UI'yı aynı domain üzerinden sunmak için
 STREAMLIT_INTERNAL_URL = os.getenv("STREAMLIT_INTERNAL_URL", "http://127.0.0.1:8501").rstrip("/")
 
+def _get_streamlit_client() -> httpx.AsyncClient:
+    """Streamlit'e giden tüm proxy istekleri için paylaşılan keep-alive client"""
+    client = getattr(app.state, "streamlit_client", None)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            follow_redirects=True,
+            # Streamlit WS ayrı yoldan (websockets) gider; HTTP istekleri takılı kalmasın
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            # Sayfa açılışında çok sayıda statik asset paralel istenir
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+        )
+        app.state.streamlit_client = client
+    return client
+
+
+# Upstream'a iletilmeyecek istek header'ları (hop-by-hop + httpx'in kendisi hesapladıkları).
+# accept-encoding korunur: gövde ham aktarıldığı için sıkıştırma tarayıcıya kadar gider.
+_PROXY_DROP_REQUEST_HEADERS = frozenset({
+    "host", "content-length", "connection", "keep-alive", "proxy-authenticate",
+    "proxy-authorization", "te", "trailers", "transfer-encoding", "upgrade",
+})
+
+
+# Yanıttan çıkarılacak hop-by-hop header'lar; gövde ham (sıkıştırılmış) aktarıldığı için content-encoding korunur
+_PROXY_DROP_RESPONSE_HEADERS = frozenset({
+    "transfer-encoding", "connection", "keep-alive", "proxy-authenticate",
+    "proxy-authorization", "te", "trailers", "upgrade",
+})
+# Streamlit build'indeki hash'li dosyalar (ör. static/js/main.4a5b6c7d.js) sürüm boyunca değişmez
+_HASHED_ASSET_RE = re.compile(r"^static/.+\.[0-9a-f]{8,}\.[a-z0-9]+$")
+_ASSET_CACHE_MAX = 200
+# (path, accept-encoding) -> (headers, ham gövde); en eski kullanılan önce atılır
+_asset_cache: "OrderedDict[Tuple[str, str], Tuple[Dict[str, str], bytes]]" = OrderedDict()
+_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
 async def _proxy_streamlit(path: str, request: Request) -> Response:
     url = f"{STREAMLIT_INTERNAL_URL}/{path}" if path else STREAMLIT_INTERNAL_URL
+    cache_key = None
+    if request.method == "GET" and _HASHED_ASSET_RE.match(path):
+        # Ham (sıkıştırılmış) gövde saklandığı için anahtar accept-encoding'i de içerir
+        cache_key = (path, request.headers.get("accept-encoding", ""))
+        cached = _asset_cache.get(cache_key)
+        if cached is not None:
+            _asset_cache.move_to_end(cache_key)
+            return Response(content=cached[1], status_code=200, headers=cached[0])
     # İstek gövdesini ve header'larını forward et
     body = await request.body()
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        resp = await client.request(request.method, url, content=body, headers=dict(request.headers))
-    # Hop-by-hop header'ları çıkar
-    excluded = {"transfer-encoding", "content-encoding", "connection"}
-    headers = {k: v for k, v in resp.headers.items() if k.lower() not in excluded}
+    client = _get_streamlit_client()
+    fwd_headers = {k: v for k, v in request.headers.items() if k.lower() not in _PROXY_DROP_REQUEST_HEADERS}
+    req = client.build_request(request.method, url, content=body, headers=fwd_headers)
+    resp = await client.send(req, stream=True)
+    # httpx header anahtarlarını küçük harfle döndürür; ek .lower() gerekmez
+    headers = {k: v for k, v in resp.headers.items() if k not in _PROXY_DROP_RESPONSE_HEADERS}
+    if cache_key is not None and resp.status_code == 200:
+        try:
+            content = b"".join([chunk async for chunk in resp.aiter_raw(65536)])
+        finally:
+            await resp.aclose()
+        headers.pop("content-length", None)
+        headers.pop("cache-control", None)
+        headers["Cache-Control"] = _IMMUTABLE_CACHE_CONTROL
+        _asset_cache[cache_key] = (headers, content)
+        if len(_asset_cache) > _ASSET_CACHE_MAX:
+            _asset_cache.popitem(last=False)
+        return Response(content=content, status_code=200, headers=headers)
     # Tarayıcı cache'ini agresif şekilde kapat — UI yüklenmesini engelleyebilecek 304/etag davranışını azaltır
     headers["Cache-Control"] = "no-store"
     headers["Pragma"] = "no-cache"
     # Content-Type'ı koru
     media_type = resp.headers.get("content-type")
-    return Response(content=resp.content, status_code=resp.status_code, headers=headers, media_type=media_type)
+    # Gövdeyi belleğe almadan 64 KB'lık parçalarla ilet; bitince upstream yanıtı kapat
+    return StreamingResponse(
+        resp.aiter_raw(65536),
+        status_code=resp.status_code,
+        headers=headers,
+        media_type=media_type,
+        background=BackgroundTask(resp.aclose),
+    )
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -640,39 +791,47 @@ async def index(request: Request):
 
 @app.get("/dashboard", response_class=HTMLResponse)
 async def dashboard(request: Request):
-    db = SessionLocal()
     settings = get_settings()
-    positions = []
     urls = resolve_base_urls()
-    try:
-        webhooks = db.query(models.WebhookEvent).order_by(models.WebhookEvent.id.desc()).limit(50).all()
-        orders = db.query(models.OrderRecord).order_by(models.OrderRecord.id.desc()).limit(50).all()
-        snap = db.query(models.BalanceSnapshot).order_by(models.BalanceSnapshot.id.desc()).first()
+
+    async def _load(stmt, first: bool = False):
+        # Her sorgu kendi session'ında: WAL sayesinde okumalar paralel çalışır
+        async with AsyncSessionLocal() as session:
+            result = (await session.execute(stmt)).scalars()
+            return result.first() if first else result.all()
+
+    async def _load_positions():
         # Try positions if live
         if settings.binance_api_key and settings.binance_api_secret and not settings.dry_run:
-            async with BinanceFuturesClient(settings.binance_api_key, settings.binance_api_secret, settings.binance_base_url) as client:
-                try:
-                    positions = await client.positions()
-                except Exception:
-                    positions = []
-        return templates.TemplateResponse(
-            "dashboard.html",
-            {
-                "request": request,
-                "webhooks": webhooks,
-                "orders": orders,
-                "snapshot": snap,
-                "whitelist": settings.get_symbols_whitelist(),
-                "allocation_pct": settings.allocation_pct,
-                "positions": positions,
-                "local_base_url": urls["local_base_url"],
-                "lan_base_url": urls["lan_base_url"],
-                "public_base_url": urls["public_base_url"],
-                "runtime": runtime.to_dict(),
-            },
-        )
-    finally:
-        db.close()
+            try:
+                return await _get_binance_client().positions()
+            except Exception:
+                return []
+        return []
+
+    # Üç DB okuması ve Binance round-trip'i eş zamanlı; toplam süre en yavaşı kadar
+    webhooks, orders, snap, positions = await asyncio.gather(
+        _load(select(models.WebhookEvent).order_by(models.WebhookEvent.id.desc()).limit(50)),
+        _load(select(models.OrderRecord).order_by(models.OrderRecord.id.desc()).limit(50)),
+        _load(select(models.BalanceSnapshot).order_by(models.BalanceSnapshot.id.desc()).limit(1), first=True),
+        _load_positions(),
+    )
+    return templates.TemplateResponse(
+        "dashboard.html",
+        {
+            "request": request,
+            "webhooks": webhooks,
+            "orders": orders,
+            "snapshot": snap,
+            "whitelist": settings.get_symbols_whitelist(),
+            "allocation_pct": settings.allocation_pct,
+            "positions": positions,
+            "local_base_url": urls["local_base_url"],
+            "lan_base_url": urls["lan_base_url"],
+            "public_base_url": urls["public_base_url"],
+            "runtime": runtime.to_dict(),
+        },
+    )
 
 # (Moved below) Catch-all proxy route is defined at the end of file
 
@@ -715,6 +874,9 @@ async def proxy_streamlit_ws(websocket: WebSocket):
             subprotocols=subprotocols if subprotocols else None,
             ping_interval=20,
             ping_timeout=20,
+            # Localhost trafiği: permessage-deflate CPU maliyeti ve frame boyut kontrolü gereksiz
+            compression=None,
+            max_size=None,
         ) as upstream:
             async def client_to_upstream():
                 try:
@@ -739,12 +901,12 @@ async def proxy_streamlit_ws(websocket: WebSocket):
 
             async def upstream_to_client():
                 try:
-                    while True:
-                        data = await upstream.recv()
-                        if isinstance(data, (bytes, bytearray)):
-                            await websocket.send_bytes(data)
+                    # websockets text frame'leri zaten str döndürür; frame tipi olduğu gibi korunur
+                    async for data in upstream:
+                        if isinstance(data, str):
+                            await websocket.send_text(data)
                         else:
-                            await websocket.send_text(str(data))
+                            await websocket.send_bytes(data)
                 except Exception:
                     # Upstream kapandı
                     pass
@@ -772,23 +934,26 @@ async def api_base_urls():
 
 
 @app.get("/api/snapshots")
-async def api_snapshots(limit: int = 200):
-    db = SessionLocal()
-    try:
-        snapshots = db.query(models.BalanceSnapshot).order_by(models.BalanceSnapshot.id.desc()).limit(limit).all()
-        data = []
-        for s in snapshots:
-            data.append({
-                "id": s.id,
-                "created_at": str(s.created_at),
-                "total_wallet_balance": s.total_wallet_balance,
-                "available_balance": s.available_balance,
-                "used_allocation_usd": s.used_allocation_usd,
-                "note": s.note,
-            })
-        return JSONResponse(content=data)
-    finally:
-        db.close()
+async def api_snapshots(limit: int = 200, db: AsyncSession = Depends(get_session)):
+    Snap = models.BalanceSnapshot
+    # ORM nesnesi yerine yalnızca gereken kolonlar (Core satırları)
+    rows = (await db.execute(
+        select(Snap.id, Snap.created_at, Snap.total_wallet_balance, Snap.available_balance, Snap.used_allocation_usd, Snap.note)
+        .order_by(Snap.id.desc())
+        .limit(limit)
+    )).mappings().all()
+    # created_at mevcut formatta (str) kalır; frontend buna göre parse ediyor
+    data = [{**r, "created_at": str(r["created_at"])} for r in rows]
+    return ORJSONResponse(content=data)
+
+
+def _apply_runtime(payload: dict) -> dict:
+    # Allow updating both leverage and risk runtime fields via one endpoint
+    runtime.set_from_dict(payload)
+    # Save to database for persistence
+    with SessionManager() as db:
+        runtime.save_to_db(db)
+    return runtime.to_dict()
 
 
 @app.get("/api/runtime")
@@ -797,262 +962,214 @@ async def get_runtime_config():
 
 
 @app.post("/api/runtime")
-async def set_runtime_config(payload: dict):
-    # Allow updating both leverage and risk runtime fields via one endpoint
-    runtime.set_from_dict(payload)
-    data = runtime.to_dict()
-    # Save to database for persistence
-    db = SessionLocal()
-    try:
-        runtime.save_to_db(db)
-    finally:
-        db.close()
-    return data
+def set_runtime_config(payload: dict):
+    return _apply_runtime(payload)
 
-# Add admin alias to fix 403/404 issues with frontend
-@app.get("/api/admin/runtime")
-async def get_admin_runtime_config():
-    return runtime.to_dict()
+# Add admin alias to fix 403/404 issues with frontend (aynı handler, ayrı yol)
+app.add_api_route("/api/admin/runtime", get_runtime_config, methods=["GET"])
 
 @app.post("/api/admin/runtime")
-async def set_admin_runtime_config(payload: dict):
-    runtime.set_from_dict(payload)
-    # Save to database for persistence
-    db = SessionLocal()
-    try:
-        runtime.save_to_db(db)
-    finally:
-        db.close()
-    return {"success": True, "data": runtime.to_dict()}
+def set_admin_runtime_config(payload: dict):
+    return {"success": True, "data": _apply_runtime(payload)}
 
 
 # ===== ENDPOINT CONFIG API'leri =====
+# Not: handler'lar istek başına AsyncSession alır; DB I/O event loop'u bloklamaz
 
 @app.get("/api/endpoint-config/{endpoint}")
-async def get_endpoint_config(endpoint: str):
+async def get_endpoint_config(endpoint: str, db: AsyncSession = Depends(get_session)):
     """Endpoint config'ini getir (DB öncelikli, yoksa .env'den)"""
-    db = SessionLocal()
-    try:
-        config = db.query(models.EndpointConfig).filter_by(endpoint=endpoint).first()
-        if config:
-            return {
-                "success": True,
-                "data": {
-                    "endpoint": config.endpoint,
-                    "trade_amount_usd": config.trade_amount_usd,
-                    "multiplier": config.multiplier,
-                    "leverage": config.leverage,
-                    "enabled": config.enabled,
-                    "created_at": str(config.created_at) if config.created_at else None,
-                    "updated_at": str(config.updated_at) if config.updated_at else None,
-                }
-            }
-        else:
-            # .env'den varsayılan değerleri döndür
-            settings = get_settings()
-            env_config = settings.get_endpoint_config(endpoint)
-            return {
-                "success": True,
-                "data": {
-                    "endpoint": endpoint,
-                    "trade_amount_usd": env_config["trade_amount_usd"],
-                    "multiplier": env_config["multiplier"],
-                    "leverage": env_config["leverage"],
-                    "enabled": True,
-                    "source": "env_defaults"
-                }
-            }
-    finally:
-        db.close()
-
-
-@app.post("/api/endpoint-config/{endpoint}")
-async def set_endpoint_config(endpoint: str, payload: dict):
-    """Endpoint config'ini güncelle veya oluştur"""
-    db = SessionLocal()
-    try:
-        config = db.query(models.EndpointConfig).filter_by(endpoint=endpoint).first()
-        if not config:
-            # .env'den varsayılan değerlerle oluştur
-            settings = get_settings()
-            env_config = settings.get_endpoint_config(endpoint)
-            config = models.EndpointConfig(
-                endpoint=endpoint,
-                trade_amount_usd=env_config["trade_amount_usd"],
-                multiplier=env_config["multiplier"],
-                leverage=env_config["leverage"],
-                enabled=True,
-            )
-            db.add(config)
-        
-        # Payload'dan gelen değerleri güncelle
-        if "trade_amount_usd" in payload:
-            config.trade_amount_usd = float(payload["trade_amount_usd"])
-        if "multiplier" in payload:
-            config.multiplier = float(payload["multiplier"])
-        if "leverage" in payload:
-            config.leverage = int(payload["leverage"])
-        if "enabled" in payload:
-            config.enabled = bool(payload["enabled"])
-        
-        db.commit()
-        db.refresh(config)
-        
+    config = (await db.execute(select(models.EndpointConfig).filter_by(endpoint=endpoint).limit(1))).scalars().first()
+    if config:
         return {
             "success": True,
-            "message": f"{endpoint} config güncellendi",
             "data": {
                 "endpoint": config.endpoint,
                 "trade_amount_usd": config.trade_amount_usd,
                 "multiplier": config.multiplier,
                 "leverage": config.leverage,
                 "enabled": config.enabled,
+                "created_at": str(config.created_at) if config.created_at else None,
+                "updated_at": str(config.updated_at) if config.updated_at else None,
             }
         }
-    finally:
-        db.close()
+    else:
+        # .env'den varsayılan değerleri döndür
+        settings = get_settings()
+        env_config = settings.get_endpoint_config(endpoint)
+        return {
+            "success": True,
+            "data": {
+                "endpoint": endpoint,
+                "trade_amount_usd": env_config["trade_amount_usd"],
+                "multiplier": env_config["multiplier"],
+                "leverage": env_config["leverage"],
+                "enabled": True,
+                "source": "env_defaults"
+            }
+        }
+
+
+@app.post("/api/endpoint-config/{endpoint}")
+async def set_endpoint_config(endpoint: str, payload: dict, db: AsyncSession = Depends(get_session)):
+    """Endpoint config'ini güncelle veya oluştur"""
+    config = (await db.execute(select(models.EndpointConfig).filter_by(endpoint=endpoint).limit(1))).scalars().first()
+    if not config:
+        # .env'den varsayılan değerlerle oluştur
+        settings = get_settings()
+        env_config = settings.get_endpoint_config(endpoint)
+        config = models.EndpointConfig(
+            endpoint=endpoint,
+            trade_amount_usd=env_config["trade_amount_usd"],
+            multiplier=env_config["multiplier"],
+            leverage=env_config["leverage"],
+            enabled=True,
+        )
+        db.add(config)
+    
+    # Payload'dan gelen değerleri güncelle
+    if "trade_amount_usd" in payload:
+        config.trade_amount_usd = float(payload["trade_amount_usd"])
+    if "multiplier" in payload:
+        config.multiplier = float(payload["multiplier"])
+    if "leverage" in payload:
+        config.leverage = int(payload["leverage"])
+    if "enabled" in payload:
+        config.enabled = bool(payload["enabled"])
+    
+    # expire_on_commit=False: commit sonrası refresh gerekmez
+    await db.commit()
+    
+    return {
+        "success": True,
+        "message": f"{endpoint} config güncellendi",
+        "data": {
+            "endpoint": config.endpoint,
+            "trade_amount_usd": config.trade_amount_usd,
+            "multiplier": config.multiplier,
+            "leverage": config.leverage,
+            "enabled": config.enabled,
+        }
+    }
 
 
 @app.get("/api/endpoint-configs")
-async def get_all_endpoint_configs():
+async def get_all_endpoint_configs(db: AsyncSession = Depends(get_session)):
     """Tüm endpoint config'lerini getir"""
-    db = SessionLocal()
-    try:
-        configs = db.query(models.EndpointConfig).all()
-        settings = get_settings()
-        
-        # Her iki endpoint için config hazırla
-        result = {}
-        for ep in ["layer1", "layer2"]:
-            config = next((c for c in configs if c.endpoint == ep), None)
-            if config:
-                result[ep] = {
-                    "endpoint": config.endpoint,
-                    "trade_amount_usd": config.trade_amount_usd,
-                    "multiplier": config.multiplier,
-                    "leverage": config.leverage,
-                    "enabled": config.enabled,
-                    "source": "db"
-                }
-            else:
-                env_config = settings.get_endpoint_config(ep)
-                result[ep] = {
-                    "endpoint": ep,
-                    "trade_amount_usd": env_config["trade_amount_usd"],
-                    "multiplier": env_config["multiplier"],
-                    "leverage": env_config["leverage"],
-                    "enabled": True,
-                    "source": "env_defaults"
-                }
-        
-        return {"success": True, "data": result}
-    finally:
-        db.close()
+    configs = (await db.execute(select(models.EndpointConfig))).scalars().all()
+    settings = get_settings()
+    
+    # Her iki endpoint için config hazırla
+    result = {}
+    for ep in ["layer1", "layer2"]:
+        config = next((c for c in configs if c.endpoint == ep), None)
+        if config:
+            result[ep] = {
+                "endpoint": config.endpoint,
+                "trade_amount_usd": config.trade_amount_usd,
+                "multiplier": config.multiplier,
+                "leverage": config.leverage,
+                "enabled": config.enabled,
+                "source": "db"
+            }
+        else:
+            env_config = settings.get_endpoint_config(ep)
+            result[ep] = {
+                "endpoint": ep,
+                "trade_amount_usd": env_config["trade_amount_usd"],
+                "multiplier": env_config["multiplier"],
+                "leverage": env_config["leverage"],
+                "enabled": True,
+                "source": "env_defaults"
+            }
+    
+    return {"success": True, "data": result}
 
 
 # ===== ENDPOINT POSITIONS API'leri =====
 
 @app.get("/api/endpoint-positions/{endpoint}")
-async def get_endpoint_positions(endpoint: str):
+async def get_endpoint_positions(endpoint: str, db: AsyncSession = Depends(get_session)):
     """Endpoint'e ait tüm pozisyonları getir"""
-    db = SessionLocal()
-    try:
-        positions = db.query(models.EndpointPosition).filter_by(endpoint=endpoint).all()
-        return {
-            "success": True,
-            "data": [
-                {
-                    "id": p.id,
-                    "endpoint": p.endpoint,
-                    "symbol": p.symbol,
-                    "side": p.side,
-                    "qty": p.qty,
-                    "entry_price": p.entry_price,
-                    "updated_at": str(p.updated_at) if p.updated_at else None,
-                }
-                for p in positions
-            ]
-        }
-    finally:
-        db.close()
+    positions = (await db.execute(select(models.EndpointPosition).filter_by(endpoint=endpoint))).scalars().all()
+    return {
+        "success": True,
+        "data": [
+            {
+                "id": p.id,
+                "endpoint": p.endpoint,
+                "symbol": p.symbol,
+                "side": p.side,
+                "qty": p.qty,
+                "entry_price": p.entry_price,
+                "updated_at": str(p.updated_at) if p.updated_at else None,
+            }
+            for p in positions
+        ]
+    }
 
 
 @app.get("/api/endpoint-positions")
-async def get_all_endpoint_positions():
+async def get_all_endpoint_positions(db: AsyncSession = Depends(get_session)):
     """Tüm endpoint pozisyonlarını getir"""
-    db = SessionLocal()
-    try:
-        positions = db.query(models.EndpointPosition).all()
-        result = {"layer1": [], "layer2": []}
-        for p in positions:
-            if p.endpoint in result:
-                result[p.endpoint].append({
-                    "id": p.id,
-                    "symbol": p.symbol,
-                    "side": p.side,
-                    "qty": p.qty,
-                    "entry_price": p.entry_price,
-                    "updated_at": str(p.updated_at) if p.updated_at else None,
-                })
-        return {"success": True, "data": result}
-    finally:
-        db.close()
+    positions = (await db.execute(select(models.EndpointPosition))).scalars().all()
+    result = {"layer1": [], "layer2": []}
+    for p in positions:
+        if p.endpoint in result:
+            result[p.endpoint].append({
+                "id": p.id,
+                "symbol": p.symbol,
+                "side": p.side,
+                "qty": p.qty,
+                "entry_price": p.entry_price,
+                "updated_at": str(p.updated_at) if p.updated_at else None,
+            })
+    return {"success": True, "data": result}
 
 
 @app.delete("/api/endpoint-positions/{endpoint}/{symbol}")
-async def delete_endpoint_position(endpoint: str, symbol: str):
+async def delete_endpoint_position(endpoint: str, symbol: str, db: AsyncSession = Depends(get_session)):
     """Belirli bir endpoint pozisyonunu sil (pozisyon sıfırla)"""
-    db = SessionLocal()
-    try:
-        position = db.query(models.EndpointPosition).filter_by(
-            endpoint=endpoint,
-            symbol=symbol
-        ).first()
-        if position:
-            db.delete(position)
-            db.commit()
-            return {"success": True, "message": f"{endpoint}/{symbol} pozisyonu silindi"}
-        else:
-            return {"success": False, "message": "Pozisyon bulunamadı"}
-    finally:
-        db.close()
+    position = (await db.execute(select(models.EndpointPosition).filter_by(
+        endpoint=endpoint,
+        symbol=symbol
+    ).limit(1))).scalars().first()
+    if position:
+        await db.delete(position)
+        await db.commit()
+        return {"success": True, "message": f"{endpoint}/{symbol} pozisyonu silindi"}
+    else:
+        return {"success": False, "message": "Pozisyon bulunamadı"}
 
 
 @app.delete("/api/endpoint-positions/{endpoint}")
-async def delete_all_endpoint_positions(endpoint: str):
+async def delete_all_endpoint_positions(endpoint: str, db: AsyncSession = Depends(get_session)):
     """Endpoint'e ait tüm pozisyonları sil"""
-    db = SessionLocal()
-    try:
-        count = db.query(models.EndpointPosition).filter_by(endpoint=endpoint).delete()
-        db.commit()
-        return {"success": True, "message": f"{endpoint} için {count} pozisyon silindi"}
-    finally:
-        db.close()
+    count = (await db.execute(delete(models.EndpointPosition).filter_by(endpoint=endpoint))).rowcount
+    await db.commit()
+    return {"success": True, "message": f"{endpoint} için {count} pozisyon silindi"}
 
 
 @app.post("/api/admin/reset-used")
-async def reset_used_allocation():
+async def reset_used_allocation(db: AsyncSession = Depends(get_session)):
     """Reset used allocation to 0 for fresh start."""
-    db = SessionLocal()
-    try:
-        # Get the last snapshot
-        last_snap = db.query(models.BalanceSnapshot).order_by(models.BalanceSnapshot.id.desc()).first()
-        if last_snap:
-            # Create a new snapshot with used_allocation_usd = 0
-            new_snap = models.BalanceSnapshot(
-                total_wallet_balance=last_snap.total_wallet_balance,
-                available_balance=last_snap.total_wallet_balance,
-                used_allocation_usd=0.0,
-                note="Admin reset: used allocation cleared"
-            )
-            db.add(new_snap)
-            db.commit()
-            return {"success": True, "message": "Used allocation reset to 0"}
-        else:
-            return {"success": False, "message": "No snapshots found"}
-
-    finally:
-        db.close()
+    # Get the last snapshot
+    Snap = models.BalanceSnapshot
+    last = (await db.execute(
+        select(Snap.total_wallet_balance).order_by(Snap.id.desc()).limit(1)
+    )).scalar_one_or_none()
+    if last is not None:
+        # Create a new snapshot with used_allocation_usd = 0
+        db.add(Snap(
+            total_wallet_balance=last,
+            available_balance=last,
+            used_allocation_usd=0.0,
+            note="Admin reset: used allocation cleared"
+        ))
+        await db.commit()
+        return {"success": True, "message": "Used allocation reset to 0"}
+    else:
+        return {"success": False, "message": "No snapshots found"}
 
 
 # Binance Test API endpoints
@@ -1063,29 +1180,17 @@ async def test_binance_connectivity():
     if not settings.binance_api_key or not settings.binance_api_secret:
         return {"success": False, "error": "API key veya secret tanımlanmamış"}
     
-    async with BinanceFuturesClient(
-        api_key=settings.binance_api_key,
-        api_secret=settings.binance_api_secret,
-        base_url=settings.binance_base_url
-    ) as client:
-        try:
-            result = await client.test_connectivity()
-            # Log
-            db = SessionLocal()
-            try:
-                _log_binance_call(db, "GET", "/fapi/v1/ping", client, response_data=result)
-            finally:
-                db.close()
-            return {"success": True, "data": result, "message": "Bağlantı başarılı"}
-        except Exception as e:
-            # Debug bilgilerini ve log'u ekle
-            db = SessionLocal()
-            try:
-                _log_binance_call(db, "GET", "/fapi/v1/ping", client, error=str(e))
-            finally:
-                db.close()
-            debug_info = client.get_last_request_debug() if hasattr(client, 'get_last_request_debug') else None
-            return {"success": False, "error": str(e), "debug_info": debug_info}
+    client = _get_binance_client()
+    try:
+        result = await client.test_connectivity()
+        # Log
+        _log_binance_call("GET", "/fapi/v1/ping", client, response_data=result)
+        return {"success": True, "data": result, "message": "Bağlantı başarılı"}
+    except Exception as e:
+        # Debug bilgilerini ve log'u ekle
+        _log_binance_call("GET", "/fapi/v1/ping", client, error=str(e))
+        debug_info = client.get_last_request_debug() if hasattr(client, 'get_last_request_debug') else None
+        return {"success": False, "error": str(e), "debug_info": debug_info}
 
 
 @app.get("/api/binance/account")
@@ -1095,29 +1200,17 @@ async def get_binance_account():
     if not settings.binance_api_key or not settings.binance_api_secret:
         return {"success": False, "error": "API key veya secret tanımlanmamış"}
     
-    async with BinanceFuturesClient(
-        api_key=settings.binance_api_key,
-        api_secret=settings.binance_api_secret,
-        base_url=settings.binance_base_url
-    ) as client:
-        try:
-            balances = await client.account_usdt_balances()
-            # Log
-            db = SessionLocal()
-            try:
-                _log_binance_call(db, "GET", "/fapi/v2/balance", client, response_data=balances)
-            finally:
-                db.close()
-            return {"success": True, "data": balances, "message": "Hesap bilgileri alındı"}
-        except Exception as e:
-            # Debug bilgilerini ve log'u ekle
-            db = SessionLocal()
-            try:
-                _log_binance_call(db, "GET", "/fapi/v2/balance", client, error=str(e))
-            finally:
-                db.close()
-            debug_info = client.get_last_request_debug() if hasattr(client, 'get_last_request_debug') else None
-            return {"success": False, "error": str(e), "debug_info": debug_info}
+    client = _get_binance_client()
+    try:
+        balances = await client.account_usdt_balances()
+        # Log
+        _log_binance_call("GET", "/fapi/v2/balance", client, response_data=balances)
+        return {"success": True, "data": balances, "message": "Hesap bilgileri alındı"}
+    except Exception as e:
+        # Debug bilgilerini ve log'u ekle
+        _log_binance_call("GET", "/fapi/v2/balance", client, error=str(e))
+        debug_info = client.get_last_request_debug() if hasattr(client, 'get_last_request_debug') else None
+        return {"success": False, "error": str(e), "debug_info": debug_info}
 
 
 @app.get("/api/binance/positions")
@@ -1127,78 +1220,51 @@ async def get_binance_positions():
     if not settings.binance_api_key or not settings.binance_api_secret:
         return {"success": False, "error": "API key veya secret tanımlanmamış"}
     
-    async with BinanceFuturesClient(
-        api_key=settings.binance_api_key,
-        api_secret=settings.binance_api_secret,
-        base_url=settings.binance_base_url
-    ) as client:
-        try:
-            positions = await client.positions()
-            # Log
-            db = SessionLocal()
-            try:
-                _log_binance_call(db, "GET", "/fapi/v2/positionRisk", client, response_data=positions)
-            finally:
-                db.close()
-            return {"success": True, "data": positions, "message": "Pozisyon bilgileri alındı"}
-        except Exception as e:
-            # Debug bilgilerini ve log'u ekle
-            db = SessionLocal()
-            try:
-                _log_binance_call(db, "GET", "/fapi/v2/positionRisk", client, error=str(e))
-            finally:
-                db.close()
-            debug_info = client.get_last_request_debug() if hasattr(client, 'get_last_request_debug') else None
-            return {"success": False, "error": str(e), "debug_info": debug_info}
+    client = _get_binance_client()
+    try:
+        positions = await client.positions()
+        # Log
+        _log_binance_call("GET", "/fapi/v2/positionRisk", client, response_data=positions)
+        return {"success": True, "data": positions, "message": "Pozisyon bilgileri alındı"}
+    except Exception as e:
+        # Debug bilgilerini ve log'u ekle
+        _log_binance_call("GET", "/fapi/v2/positionRisk", client, error=str(e))
+        debug_info = client.get_last_request_debug() if hasattr(client, 'get_last_request_debug') else None
+        return {"success": False, "error": str(e), "debug_info": debug_info}
+
+
+async def _get_price(symbol: str) -> float:
+    return await cached_ticker_price(_get_binance_client(), symbol)
 
 
 @app.get("/api/binance/price/{symbol}")
 async def get_binance_price(symbol: str):
     """Get current price for a symbol"""
-    settings = get_settings()
-    async with BinanceFuturesClient(
-        api_key=settings.binance_api_key,
-        api_secret=settings.binance_api_secret,
-        base_url=settings.binance_base_url
-    ) as client:
-        try:
-            price = await client.ticker_price(symbol.upper())
-            return {"success": True, "symbol": symbol.upper(), "price": price}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+    symbol = symbol.upper()
+    try:
+        price = await _get_price(symbol)
+        return {"success": True, "symbol": symbol, "price": price}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
 
 # Alias: support query-style access as used by some frontends
-@app.get("/api/binance/price")
-async def get_binance_price_query(symbol: str):
-    # Doğrudan bir coroutine döndürmek yerine, sonucunu bekleyip (await) döndürüyoruz
-    return await get_binance_price(symbol)
+# Aynı handler; path parametresi olmayan yolda `symbol` query'den okunur
+app.add_api_route("/api/binance/price", get_binance_price, methods=["GET"])
 
 
 @app.get("/api/orders")
-async def api_orders(limit: int = 50):
-    db = SessionLocal()
-    try:
-        orders = db.query(models.OrderRecord).order_by(models.OrderRecord.id.desc()).limit(limit).all()
-        data = [
-            {
-                "id": o.id,
-                "symbol": o.symbol,
-                "side": o.side,
-                "position_side": o.position_side,
-                "leverage": o.leverage,
-                "qty": o.qty,
-                "price": o.price,
-                "status": o.status,
-                "binance_order_id": o.binance_order_id,
-                "created_at": str(o.created_at),
-                "response": o.response,
-            }
-            for o in orders
-
-        ]
-        return JSONResponse(content=data)
-    finally:
-        db.close()
+async def api_orders(limit: int = 50, db: AsyncSession = Depends(get_session)):
+    Order = models.OrderRecord
+    rows = (await db.execute(
+        select(
+            Order.id, Order.symbol, Order.side, Order.position_side, Order.leverage, Order.qty,
+            Order.price, Order.status, Order.binance_order_id, Order.created_at, Order.response,
+        )
+        .order_by(Order.id.desc())
+        .limit(limit)
+    )).mappings().all()
+    data = [{**r, "created_at": str(r["created_at"])} for r in rows]
+    return ORJSONResponse(content=data)
 
 
 @app.post("/api/binance/create-order")
@@ -1208,117 +1274,111 @@ async def create_binance_order(payload: schemas.TradingViewWebhook):
     if not settings.binance_api_key or not settings.binance_api_secret:
         return {"success": False, "error": "API key veya secret tanımlanmamış"}
     
-    db = SessionLocal()
+    client = _get_binance_client()
     try:
-        async with BinanceFuturesClient(
-            api_key=settings.binance_api_key,
-            api_secret=settings.binance_api_secret,
-            base_url=settings.binance_base_url
-        ) as client:
-            # Symbol kontrolü
-            symbol = payload.symbol
-            if not symbol:
-                return {"success": False, "error": "Symbol gerekli"}
+        # Symbol kontrolü
+        symbol = payload.symbol
+        if not symbol:
+            return {"success": False, "error": "Symbol gerekli"}
             
-            # Signal kontrolü ve dönüştürme
-            signal = payload.signal.upper()
-            if signal in ("AL", "BUY", "LONG"):
-                side = "BUY"
-            elif signal in ("SAT", "SELL", "SHORT"):
-                side = "SELL"
-            else:
-                return {"success": False, "error": "Desteklenmeyen sinyal"}
+        # Signal kontrolü ve dönüştürme
+        signal = payload.signal.upper()
+        if signal in ("AL", "BUY", "LONG"):
+            side = "BUY"
+        elif signal in ("SAT", "SELL", "SHORT"):
+            side = "SELL"
+        else:
+            return {"success": False, "error": "Desteklenmeyen sinyal"}
             
-            # Whitelist kontrolü
-            whitelist = settings.get_symbols_whitelist()
-            if symbol.upper() not in whitelist:
-                return {"success": False, "error": "Symbol izin listesinde değil"}
+        # Whitelist kontrolü
+        if symbol.upper() not in settings.symbols_whitelist_set:
+            return {"success": False, "error": "Symbol izin listesinde değil"}
             
-            # Qty ve price kontrolü
-            if not payload.qty or payload.qty <= 0:
-                return {"success": False, "error": "Geçerli bir miktar (qty) gerekli"}
+        # Qty ve price kontrolü
+        if not payload.qty or payload.qty <= 0:
+            return {"success": False, "error": "Geçerli bir miktar (qty) gerekli"}
             
-            if not payload.price or payload.price <= 0:
-                return {"success": False, "error": "Geçerli bir fiyat gerekli"}
+        if not payload.price or payload.price <= 0:
+            return {"success": False, "error": "Geçerli bir fiyat gerekli"}
             
-            # Exchange info ile lot doğrulaması ve qty yuvarlama
-            ex_info = await client.exchange_info()
-            filters = get_symbol_filters(ex_info, symbol)
-            step = float(filters.get("stepSize", 0.0) or 0.0)
-            min_qty = float(filters.get("minQty", 0.0) or 0.0)
-            qty_rounded = round_step(float(payload.qty), step if step > 0 else 0.0001)
-            if qty_rounded < min_qty or qty_rounded <= 0:
-                return {"success": False, "error": f"Miktar minQty altında. minQty={min_qty}, stepSize={step}, gelen={payload.qty}"}
+        # Exchange info ile lot doğrulaması ve qty yuvarlama
+        filters = await cached_symbol_filters(client, symbol)
+        step = float(filters.get("stepSize", 0.0) or 0.0)
+        min_qty = float(filters.get("minQty", 0.0) or 0.0)
+        qty_rounded = round_step(float(payload.qty), step if step > 0 else 0.0001)
+        if qty_rounded < min_qty or qty_rounded <= 0:
+            return {"success": False, "error": f"Miktar minQty altında. minQty={min_qty}, stepSize={step}, gelen={payload.qty}"}
             
-            # Leverage ayarla
-            leverage = payload.leverage or 1
+        # Leverage ayarla
+        leverage = payload.leverage or 1
             
-            # Hedge modu ise positionSide belirle
+        # Hedge modu ise positionSide belirle
+        position_side = None
+        try:
+            pm = await cached_position_mode(client)
+            if bool(pm.get("dualSidePosition")):
+                position_side = "LONG" if side == "BUY" else "SHORT"
+        except Exception:
             position_side = None
-            try:
-                pm = await client.position_mode()
-                if bool(pm.get("dualSidePosition")):
-                    position_side = "LONG" if side == "BUY" else "SHORT"
-            except Exception:
-                position_side = None
             
-            if settings.dry_run:
-                # Dry run modu — Binance'e emir gönderme
-                order_response = {
-                    "dry_run": True,
-                    "symbol": symbol,
-                    "side": side,
-                    "qty": qty_rounded,
-                    "leverage": leverage,
-                    "price": payload.price,
-                    "position_side": position_side,
-                    "note": "Direkt emir (dry run)"
-                }
-            else:
-                # Gerçek emir
-                try:
-                    # Leverage ayarla
-                    resp1 = await client.set_leverage(symbol, leverage)
-                    _log_binance_call(db, "POST", "/fapi/v1/leverage", client, response_data=resp1)
+        if settings.dry_run:
+            # Dry run modu — Binance'e emir gönderme
+            order_response = {
+                "dry_run": True,
+                "symbol": symbol,
+                "side": side,
+                "qty": qty_rounded,
+                "leverage": leverage,
+                "price": payload.price,
+                "position_side": position_side,
+                "note": "Direkt emir (dry run)"
+            }
+        else:
+            # Gerçek emir
+            try:
+                # Leverage ayarla
+                resp1 = await client.set_leverage(symbol, leverage)
+                _log_binance_call("POST", "/fapi/v1/leverage", client, response_data=resp1)
                     
-                    # Market emri ver (yuvarlanmış qty ile)
-                    order_response = await client.place_market_order(symbol, side, qty_rounded, position_side=position_side)
-                    _log_binance_call(db, "POST", "/fapi/v1/order", client, response_data=order_response)
+                # Market emri ver (yuvarlanmış qty ile)
+                order_response = await client.place_market_order(symbol, side, qty_rounded, position_side=position_side)
+                _log_binance_call("POST", "/fapi/v1/order", client, response_data=order_response)
                     
-                    # orderId yoksa uyarı olarak döndür
-                    if order_response.get("orderId") is None:
-                        return {"success": False, "error": "Binance response içinde orderId yok; emir yerleşmemiş olabilir", "response": order_response}
-                except Exception as e:
-                    # Hata durumunda log
-                    _log_binance_call(db, "POST", "/fapi/v1/order", client, error=str(e))
-                    return {"success": False, "error": f"Emir başarısız: {str(e)}"}
+                # orderId yoksa uyarı olarak döndür
+                if order_response.get("orderId") is None:
+                    return {"success": False, "error": "Binance response içinde orderId yok; emir yerleşmemiş olabilir", "response": order_response}
+            except Exception as e:
+                # Hata durumunda log; -1121 (Invalid symbol) gelirse exchangeInfo cache'ini düşür
+                _log_binance_call("POST", "/fapi/v1/order", client, error=str(e))
+                invalidate_on_invalid_symbol(client, e)
+                return {"success": False, "error": f"Emir başarısız: {str(e)}"}
             
-            # Emir kaydını veritabanına kaydet
-            order = models.OrderRecord(
-                symbol=symbol,
-                side=side,
-                position_side=position_side,
-                leverage=leverage,
-                qty=qty_rounded,
-                price=payload.price,
-                status=str(order_response.get("status", "NEW")),
-                binance_order_id=str(order_response.get("orderId")) if order_response.get("orderId") is not None else None,
-                response=order_response,
-            )
+        # Emir kaydını veritabanına kaydet (session yalnızca yazma süresince açık)
+        binance_order_id = str(order_response.get("orderId")) if order_response.get("orderId") is not None else None
+        order = models.OrderRecord(
+            symbol=symbol,
+            side=side,
+            position_side=position_side,
+            leverage=leverage,
+            qty=qty_rounded,
+            price=payload.price,
+            status=str(order_response.get("status", "NEW")),
+            binance_order_id=binance_order_id,
+            response=order_response,
+        )
+        async with AsyncSessionLocal() as db:
             db.add(order)
-            db.commit()
+            await db.commit()
             
-            return {
-                "success": True,
-                "message": "Dry-run: emir simüle edildi" if settings.dry_run else "Gerçek emir başarıyla oluşturuldu",
-                "order_id": order.binance_order_id,
-                "response": order_response
-            }
+        return {
+            "success": True,
+            "message": "Dry-run: emir simüle edildi" if settings.dry_run else "Gerçek emir başarıyla oluşturuldu",
+            "order_id": binance_order_id,
+            "response": order_response
+        }
         
     except Exception as e:
         return {"success": False, "error": str(e)}
-    finally:
-        db.close()
 
 
 @app.get("/api/debug/routes")
@@ -1344,9 +1404,9 @@ async def test_telegram():
             "chat_id_value": settings.telegram_chat_id
         }
     
-    notifier = TelegramNotifier(settings.telegram_bot_token, settings.telegram_chat_id)
+    notifier = _get_notifier()
     try:
-        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+        timestamp = _utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
         result = await notifier.send_message(f"🧪 Test Mesajı - {timestamp}")
         
         if result:
@@ -1371,8 +1431,6 @@ async def test_telegram():
             "bot_token_preview": settings.telegram_bot_token[:20] + "..." if len(settings.telegram_bot_token) > 20 else settings.telegram_bot_token,
             "chat_id": settings.telegram_chat_id
         }
-    finally:
-        await notifier.close()
 
 
 @app.get("/api/telegram/test")
@@ -1381,6 +1439,24 @@ async def test_telegram_get():
     return await test_telegram()
 
 # Catch-all proxy: bilinmeyen yolları Streamlit'e yönlendir (dosyanın sonunda tanımlı)
+async def _streamlit_asgi(scope, receive, send):
+    """Streamlit asset yolları için ham ASGI geçişi (FastAPI route/dependency çözümü yok)."""
+    if scope["type"] != "http":
+        # /_stcore/stream WebSocket'i yukarıdaki route ile eşleşir; diğerlerini reddet
+        await send({"type": "websocket.close", "code": 1000})
+        return
+    request = Request(scope, receive)
+    raw_path = scope.get("raw_path")
+    path = raw_path.decode("latin-1") if raw_path else scope["path"]
+    response = await _proxy_streamlit(path.lstrip("/"), request)
+    await response(scope, receive, send)
+
+
+# Streamlit'in statik/JS/CSS ve medya istekleri catch-all route'a düşmeden doğrudan proxy'lenir
+for _prefix in ("/static", "/_stcore", "/media"):
+    app.mount(_prefix, _streamlit_asgi)
+
+
 @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"])
 async def proxy_all(path: str, request: Request):
     # Backend'in açık yolları öncelikle eşleşecektir; geriye kalan her şeyi UI'ya aktar
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, JSON, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, JSON, Text, Index
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -83,6 +83,9 @@ class EndpointPosition(Base):
 	entry_price = Column(Float, nullable=True)
 	updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+	# Webhook/position sorgusu: endpoint = ? AND symbol = ?
+	__table_args__ = (Index("ix_endpoint_positions_endpoint_symbol", "endpoint", "symbol"),)
+
 
 class EndpointConfig(Base):
 	"""Her endpoint için ayrı ayarlar"""
@@ -109,3 +112,6 @@ class LayerSnapshot(Base):
 	position_count = Column(Integer, default=0)
 	created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
+	# Grafik sorgusu: endpoint IN (...) AND created_at >= T ORDER BY created_at
+	__table_args__ = (Index("ix_layer_snapshots_endpoint_created_at", "endpoint", "created_at"),)
+
@@ -7,8 +7,9 @@ import math
 from .. import schemas, models
 from ..database import SessionLocal
 from ..config import get_settings
-from ..services.binance_client import BinanceFuturesClient
-from ..services.order_sizing import compute_quantity, get_symbol_filters, round_step
+from ..services.binance_client import BinanceFuturesClient, get_shared_client
+from ..services.order_sizing import compute_quantity, round_step
+from ..services.binance_cache import cached_exchange_info, cached_symbol_filters, cached_position_mode, remember_position_mode, invalidate_on_invalid_symbol
 from ..services.telegram import TelegramNotifier
 from ..state import runtime
 from ..services.ws_manager import ws_manager
@@ -301,347 +302,352 @@ async def process_webhook_request(queue_item: Dict[str, Any]) -> Dict[str, Any]:
 					"response": {"db_position": {"side": db_position.side, "qty": db_position.qty}},
 				}
 		
-		async with BinanceFuturesClient(
-			api_key=settings.binance_api_key,
-			api_secret=settings.binance_api_secret,
-			base_url=settings.binance_base_url,
-		) as client:
-			# Exchange info
+		# Paylaşılan client: keep-alive bağlantılar webhook'lar arasında yeniden kullanılır
+		client = get_shared_client(settings.binance_api_key, settings.binance_api_secret, settings.binance_base_url)
+		# Exchange info
+		def log_exchange_info(resp: Any) -> None:
+			_log_binance_call(db, "GET", "/fapi/v1/exchangeInfo", client, response_data=resp)
+		
+		try:
+			# Log yalnızca gerçek fetch'te (cache hit'te HTTP çağrısı yok)
+			await cached_exchange_info(client, on_fetch=log_exchange_info)
+		except Exception as e:
+			_log_binance_call(db, "GET", "/fapi/v1/exchangeInfo", client, error=str(e))
+			update_webhook_status("failed")
+			return {
+				"success": False,
+				"error": f"exchangeInfo hatası: {e}",
+				"order_id": None,
+				"response": None,
+			}
+		
+		# Position mode
+		try:
+			pmode = await cached_position_mode(
+				client,
+				on_fetch=lambda resp: _log_binance_call(db, "GET", "/fapi/v1/positionSide/dual", client, response_data=resp),
+			)
+			dual_mode = bool(pmode.get("dualSidePosition"))
+		except Exception as e:
+			_log_binance_call(db, "GET", "/fapi/v1/positionSide/dual", client, error=str(e))
+			dual_mode = False
+		
+		# Force One-way if not dry-run
+		force_msg = None
+		if not settings.dry_run and dual_mode:
 			try:
-				ex_info = await client.exchange_info()
-				_log_binance_call(db, "GET", "/fapi/v1/exchangeInfo", client, response_data=ex_info)
+				resp_mode = await client.set_position_mode(dual=False)
+				remember_position_mode(client, False)
+				_log_binance_call(db, "POST", "/fapi/v1/positionSide/dual", client, response_data=resp_mode)
+				dual_mode = False
+				force_msg = "Pozisyon modu One-way olarak ayarlandı."
 			except Exception as e:
-				_log_binance_call(db, "GET", "/fapi/v1/exchangeInfo", client, error=str(e))
+				_log_binance_call(db, "POST", "/fapi/v1/positionSide/dual", client, error=str(e))
 				update_webhook_status("failed")
 				return {
 					"success": False,
-					"error": f"exchangeInfo hatası: {e}",
+					"error": f"Pozisyon modu One-way'a çekilemedi: {e}",
 					"order_id": None,
 					"response": None,
 				}
-			
-			# Position mode
-			try:
-				pmode = await client.position_mode()
-				_log_binance_call(db, "GET", "/fapi/v1/positionSide/dual", client, response_data=pmode)
-				dual_mode = bool(pmode.get("dualSidePosition"))
-			except Exception as e:
-				_log_binance_call(db, "GET", "/fapi/v1/positionSide/dual", client, error=str(e))
-				dual_mode = False
-			
-			# Force One-way if not dry-run
-			force_msg = None
-			if not settings.dry_run and dual_mode:
-				try:
-					resp_mode = await client.set_position_mode(dual=False)
-					_log_binance_call(db, "POST", "/fapi/v1/positionSide/dual", client, response_data=resp_mode)
-					dual_mode = False
-					force_msg = "Pozisyon modu One-way olarak ayarlandı."
-				except Exception as e:
-					_log_binance_call(db, "POST", "/fapi/v1/positionSide/dual", client, error=str(e))
-					update_webhook_status("failed")
-					return {
-						"success": False,
-						"error": f"Pozisyon modu One-way'a çekilemedi: {e}",
-						"order_id": None,
-						"response": None,
-					}
-			
-			# Get balance
-			available_balance = 100000.0
-			balance_before = 100000.0
-			if settings.binance_api_key and settings.binance_api_secret and not settings.dry_run:
-				try:
-					acct = await client.account_usdt_balances()
-					_log_binance_call(db, "GET", "/fapi/v2/balance", client, response_data=acct)
-					available_balance = acct.get("available", 100000.0)
-					balance_before = available_balance
-				except Exception as e:
-					_log_binance_call(db, "GET", "/fapi/v2/balance", client, error=str(e))
-					update_webhook_status("failed")
-					return {
-						"success": False,
-						"error": f"Balance alınamadı: {e}",
-						"order_id": None,
-						"response": None,
-					}
-			
-			# Leverage - endpoint config'den al
-			leverage = endpoint_config.leverage or settings.default_leverage or 1
-			
-			# Get price
+		
+		# Get balance
+		available_balance = 100000.0
+		balance_before = 100000.0
+		if settings.binance_api_key and settings.binance_api_secret and not settings.dry_run:
 			try:
-				current_price = await client.ticker_price(symbol)
-				_log_binance_call(db, "GET", "/fapi/v1/ticker/price", client, response_data={"symbol": symbol, "price": current_price})
-				if current_price <= 0:
-					raise ValueError("Geçersiz fiyat")
+				acct = await client.account_usdt_balances()
+				_log_binance_call(db, "GET", "/fapi/v2/balance", client, response_data=acct)
+				available_balance = acct.get("available", 100000.0)
+				balance_before = available_balance
 			except Exception as e:
-				_log_binance_call(db, "GET", "/fapi/v1/ticker/price", client, error=str(e))
-				update_webhook_status("failed")
-				return {
-					"success": False,
-					"error": f"Fiyat bilgisi alınamadı: {e}",
-					"order_id": None,
-					"response": None,
-				}
-			
-			# Quantity calculation - endpoint config'den al
-			filters = get_symbol_filters(ex_info, symbol)
-			step = filters["stepSize"] or 0.0001
-			
-			# Endpoint config'den trade amount ve multiplier al
-			trade_amount_usdt = endpoint_config.trade_amount_usd * endpoint_config.multiplier
-			
-			lev = max(1, int(leverage or 1))
-			notional = trade_amount_usdt * lev
-			base_qty = notional / current_price
-			base_qty = round_step(base_qty, step)
-			
-			step_str = "{:.8f}".format(step).rstrip('0')
-			precision = 0
-			if "." in step_str:
-				precision = len(step_str.split(".")[1])
-			
-			formatted_qty = "{:.{p}f}".format(base_qty, p=precision)
-			order_qty = float(formatted_qty)
-			
-			if order_qty <= 0 or order_qty < filters["minQty"]:
+				_log_binance_call(db, "GET", "/fapi/v2/balance", client, error=str(e))
 				update_webhook_status("failed")
 				return {
 					"success": False,
-					"error": "Hesaplanan quantity minimum lot size'dan küçük",
+					"error": f"Balance alınamadı: {e}",
 					"order_id": None,
 					"response": None,
 				}
-			
-			# ===== TERS POZİSYON KAPATMA (DB'DEN MİKTAR AL) =====
-			closed_position_msg = None
-			position_side = None
-			if dual_mode:
-				position_side = "LONG" if side == "BUY" else "SHORT"
-			
+		
+		# Leverage - endpoint config'den al
+		leverage = endpoint_config.leverage or settings.default_leverage or 1
+		
+		# Get price
+		try:
+			current_price = await client.ticker_price(symbol)
+			_log_binance_call(db, "GET", "/fapi/v1/ticker/price", client, response_data={"symbol": symbol, "price": current_price})
+			if current_price <= 0:
+				raise ValueError("Geçersiz fiyat")
+		except Exception as e:
+			_log_binance_call(db, "GET", "/fapi/v1/ticker/price", client, error=str(e))
+			update_webhook_status("failed")
+			return {
+				"success": False,
+				"error": f"Fiyat bilgisi alınamadı: {e}",
+				"order_id": None,
+				"response": None,
+			}
+		
+		# Quantity calculation - endpoint config'den al
+		filters = await cached_symbol_filters(client, symbol, on_fetch=log_exchange_info)
+		step = filters["stepSize"] or 0.0001
+		
+		# Endpoint config'den trade amount ve multiplier al
+		trade_amount_usdt = endpoint_config.trade_amount_usd * endpoint_config.multiplier
+		
+		lev = max(1, int(leverage or 1))
+		notional = trade_amount_usdt * lev
+		base_qty = notional / current_price
+		base_qty = round_step(base_qty, step)
+		
+		step_str = "{:.8f}".format(step).rstrip('0')
+		precision = 0
+		if "." in step_str:
+			precision = len(step_str.split(".")[1])
+		
+		formatted_qty = "{:.{p}f}".format(base_qty, p=precision)
+		order_qty = float(formatted_qty)
+		
+		if order_qty <= 0 or order_qty < filters["minQty"]:
+			update_webhook_status("failed")
+			return {
+				"success": False,
+				"error": "Hesaplanan quantity minimum lot size'dan küçük",
+				"order_id": None,
+				"response": None,
+			}
+		
+		# ===== TERS POZİSYON KAPATMA (DB'DEN MİKTAR AL) =====
+		closed_position_msg = None
+		position_side = None
+		if dual_mode:
+			position_side = "LONG" if side == "BUY" else "SHORT"
+		
 		# DB'den bu endpoint'in ters pozisyonunu kontrol et
-			opposite_detected = False
-			if db_position and db_position.qty > 0:
-				# Ters yönde pozisyon var mı?
-				if side == "BUY" and db_position.side == "SHORT":
-					opposite_detected = True
-				elif side == "SELL" and db_position.side == "LONG":
-					opposite_detected = True
+		opposite_detected = False
+		if db_position and db_position.qty > 0:
+			# Ters yönde pozisyon var mı?
+			if side == "BUY" and db_position.side == "SHORT":
+				opposite_detected = True
+			elif side == "SELL" and db_position.side == "LONG":
+				opposite_detected = True
+		
+		if opposite_detected:
+			close_qty = db_position.qty  # DB'deki miktar
+			# Mevcut pozisyonu kapatmak için gereken taraf:
+			# SHORT kapatmak için BUY, LONG kapatmak için SELL
+			close_side = "BUY" if db_position.side == "SHORT" else "SELL"
 			
-			if opposite_detected:
-				close_qty = db_position.qty  # DB'deki miktar
-				# Mevcut pozisyonu kapatmak için gereken taraf:
-				# SHORT kapatmak için BUY, LONG kapatmak için SELL
-				close_side = "BUY" if db_position.side == "SHORT" else "SELL"
-				
-				if not settings.dry_run:
-					try:
-						close_resp = await client.place_market_order(
-							symbol, 
-							close_side, 
-							close_qty, 
-							position_side=db_position.side if dual_mode else None,
-							reduce_only=True
-						)
-						_log_binance_call(db, "POST", "/fapi/v1/order (close)", client, response_data=close_resp)
-						closed_position_msg = f"[{endpoint_label}] Ters pozisyon kapatıldı: {close_side} {close_qty} (eski: {db_position.side})"
-						
-						# DB'deki pozisyonu sıfırla
-						update_endpoint_position(db, endpoint, symbol, "", 0, None)
-						db.commit()
-					except Exception as e:
-						_log_binance_call(db, "POST", "/fapi/v1/order (close)", client, error=str(e))
-						# Hata olsa bile devam et, belki Binance'de pozisyon yoktur
-				else:
-					closed_position_msg = f"[{endpoint_label}][DRY_RUN] Ters pozisyon kapatılacaktı: {close_side} {close_qty} (eski: {db_position.side})"
-					# Dry run'da da DB'yi güncelle
+			if not settings.dry_run:
+				try:
+					close_resp = await client.place_market_order(
+						symbol, 
+						close_side, 
+						close_qty, 
+						position_side=db_position.side if dual_mode else None,
+						reduce_only=True
+					)
+					_log_binance_call(db, "POST", "/fapi/v1/order (close)", client, response_data=close_resp)
+					closed_position_msg = f"[{endpoint_label}] Ters pozisyon kapatıldı: {close_side} {close_qty} (eski: {db_position.side})"
+					
+					# DB'deki pozisyonu sıfırla
 					update_endpoint_position(db, endpoint, symbol, "", 0, None)
 					db.commit()
-			
-			# Bracket check
-			bracket_warn = None
+				except Exception as e:
+					_log_binance_call(db, "POST", "/fapi/v1/order (close)", client, error=str(e))
+					# Hata olsa bile devam et, belki Binance'de pozisyon yoktur
+			else:
+				closed_position_msg = f"[{endpoint_label}][DRY_RUN] Ters pozisyon kapatılacaktı: {close_side} {close_qty} (eski: {db_position.side})"
+				# Dry run'da da DB'yi güncelle
+				update_endpoint_position(db, endpoint, symbol, "", 0, None)
+				db.commit()
+		
+		# Bracket check
+		bracket_warn = None
+		try:
+			risks = await client.position_risk([symbol])
+			_log_binance_call(db, "GET", "/fapi/v2/positionRisk", client, response_data=risks)
+			entry = None
+			if dual_mode:
+				desired_side = "LONG" if side == "BUY" else "SHORT"
+				for r in risks:
+					if r.get("symbol") == symbol and r.get("positionSide", "BOTH") == desired_side:
+						entry = r
+						break
+			else:
+				for r in risks:
+					if r.get("symbol") == symbol:
+						entry = r
+						break
+			if entry:
+				max_notional = float(entry.get("maxNotionalValue") or 0.0)
+				new_notional = order_qty * current_price
+				if new_notional > max_notional and max_notional > 0:
+					allowed_qty = (max_notional / current_price) if current_price > 0 else 0.0
+					allowed_qty = round_step(allowed_qty, step)
+					formatted_allowed = "{:.{p}f}".format(allowed_qty, p=precision)
+					order_qty = float(formatted_allowed)
+					bracket_warn = f"Qty braket ile sınırlandı: maxNotional={max_notional}, price={current_price}, allowed_qty={order_qty}"
+		except Exception as e:
+			_log_binance_call(db, "GET", "/fapi/v2/positionRisk", client, error=str(e))
+		
+		if (not settings.dry_run) and order_qty <= 0:
+			update_webhook_status("failed")
+			return {
+				"success": False,
+				"error": "Mevcut kaldıraç seviyesinde izin verilen maksimum pozisyon sınırı nedeniyle yeni pozisyon açılamıyor (maxNotional).",
+				"order_id": None,
+				"response": None,
+			}
+		
+		# Place order
+		order_response: Dict[str, Any]
+		if settings.dry_run:
+			order_response = {
+				"dry_run": True,
+				"endpoint": endpoint,
+				"symbol": symbol,
+				"side": side,
+				"qty": order_qty,
+				"leverage": leverage,
+				"price": current_price,
+				"position_side": position_side,
+				"note": force_msg,
+				"available_balance": available_balance,
+				"trade_amount_usdt": trade_amount_usdt,
+				"closed_position_msg": closed_position_msg,
+			}
+		else:
 			try:
-				risks = await client.position_risk([symbol])
-				_log_binance_call(db, "GET", "/fapi/v2/positionRisk", client, response_data=risks)
-				entry = None
-				if dual_mode:
-					desired_side = "LONG" if side == "BUY" else "SHORT"
-					for r in risks:
-						if r.get("symbol") == symbol and r.get("positionSide", "BOTH") == desired_side:
-							entry = r
-							break
-				else:
-					for r in risks:
-						if r.get("symbol") == symbol:
-							entry = r
-							break
-				if entry:
-					max_notional = float(entry.get("maxNotionalValue") or 0.0)
-					new_notional = order_qty * current_price
-					if new_notional > max_notional and max_notional > 0:
-						allowed_qty = (max_notional / current_price) if current_price > 0 else 0.0
-						allowed_qty = round_step(allowed_qty, step)
-						formatted_allowed = "{:.{p}f}".format(allowed_qty, p=precision)
-						order_qty = float(formatted_allowed)
-						bracket_warn = f"Qty braket ile sınırlandı: maxNotional={max_notional}, price={current_price}, allowed_qty={order_qty}"
+				resp1 = await client.set_leverage(symbol, leverage)
+				_log_binance_call(db, "POST", "/fapi/v1/leverage", client, response_data=resp1)
 			except Exception as e:
-				_log_binance_call(db, "GET", "/fapi/v2/positionRisk", client, error=str(e))
-			
-			if (not settings.dry_run) and order_qty <= 0:
+				extra = None
+				if isinstance(e, httpx.HTTPStatusError):
+					try:
+						extra = e.response.json()
+					except Exception:
+						extra = e.response.text
+				invalidate_on_invalid_symbol(client, e)
+				err_msg = f"Leverage ayarlanamadı: {e}" + (f" | Binance: {extra}" if extra else "")
+				_log_binance_call(db, "POST", "/fapi/v1/leverage", client, error=err_msg)
 				update_webhook_status("failed")
 				return {
 					"success": False,
-					"error": "Mevcut kaldıraç seviyesinde izin verilen maksimum pozisyon sınırı nedeniyle yeni pozisyon açılamıyor (maxNotional).",
+					"error": err_msg,
 					"order_id": None,
 					"response": None,
 				}
 			
-			# Place order
-			order_response: Dict[str, Any]
-			if settings.dry_run:
-				order_response = {
-					"dry_run": True,
-					"endpoint": endpoint,
-					"symbol": symbol,
-					"side": side,
-					"qty": order_qty,
-					"leverage": leverage,
-					"price": current_price,
-					"position_side": position_side,
-					"note": force_msg,
-					"available_balance": available_balance,
-					"trade_amount_usdt": trade_amount_usdt,
-					"closed_position_msg": closed_position_msg,
-				}
-			else:
-				try:
-					resp1 = await client.set_leverage(symbol, leverage)
-					_log_binance_call(db, "POST", "/fapi/v1/leverage", client, response_data=resp1)
-				except Exception as e:
-					extra = None
-					if isinstance(e, httpx.HTTPStatusError):
-						try:
-							extra = e.response.json()
-						except Exception:
-							extra = e.response.text
-					err_msg = f"Leverage ayarlanamadı: {e}" + (f" | Binance: {extra}" if extra else "")
-					_log_binance_call(db, "POST", "/fapi/v1/leverage", client, error=err_msg)
-					update_webhook_status("failed")
-					return {
-						"success": False,
-						"error": err_msg,
-						"order_id": None,
-						"response": None,
-					}
-				
-				try:
-					resp_margin = await client.set_margin_type(symbol, "ISOLATED")
-					_log_binance_call(db, "POST", "/fapi/v1/marginType", client, response_data=resp_margin)
-				except Exception as e:
-					extra = None
-					if isinstance(e, httpx.HTTPStatusError):
-						try:
-							extra = e.response.json()
-							if extra.get("code") == -4046:
-								pass
-							else:
-								raise
-						except Exception:
-							extra = e.response.text
+			try:
+				resp_margin = await client.set_margin_type(symbol, "ISOLATED")
+				_log_binance_call(db, "POST", "/fapi/v1/marginType", client, response_data=resp_margin)
+			except Exception as e:
+				extra = None
+				if isinstance(e, httpx.HTTPStatusError):
+					try:
+						extra = e.response.json()
+						if extra.get("code") == -4046:
+							pass
+						else:
 							raise
-					else:
-						_log_binance_call(db, "POST", "/fapi/v1/marginType", client, error=str(e))
-				
-				try:
-					order_response = await client.place_market_order(symbol, side, order_qty, position_side=position_side)
-					_log_binance_call(db, "POST", "/fapi/v1/order", client, response_data=order_response)
-				except Exception as e:
-					extra = None
-					if isinstance(e, httpx.HTTPStatusError):
-						try:
-							extra = e.response.json()
-						except Exception:
-							extra = e.response.text
-					err_msg = f"Emir başarısız: {e}" + (f" | Binance: {extra}" if extra else "")
-					_log_binance_call(db, "POST", "/fapi/v1/order", client, error=err_msg)
-					update_webhook_status("failed")
-					return {
-						"success": False,
-						"error": err_msg,
-						"order_id": None,
-						"response": None,
-					}
-			
-			# ===== DB'DE POZİSYON MİKTARINI GÜNCELLE =====
-			update_endpoint_position(db, endpoint, symbol, new_position_side, order_qty, current_price)
-			
-			# Save order record
-			order = models.OrderRecord(
-				endpoint=endpoint,
-				symbol=symbol,
-				side=side,
-				position_side=position_side,
-				leverage=leverage,
-				qty=order_qty,
-				price=current_price,
-				status=str(order_response.get("status", "NEW")),
-				binance_order_id=str(order_response.get("orderId")) if order_response.get("orderId") is not None else None,
-				response=order_response,
-			)
-			db.add(order)
-			
-			# Balance after
-			balance_after = balance_before
-			if settings.binance_api_key and settings.binance_api_secret and not settings.dry_run:
-				try:
-					acct_after = await client.account_usdt_balances()
-					_log_binance_call(db, "GET", "/fapi/v2/balance (after)", client, response_data=acct_after)
-					balance_after = acct_after.get("available", balance_before)
-				except Exception as e:
-					_log_binance_call(db, "GET", "/fapi/v2/balance (after)", client, error=str(e))
-			
-			# Balance snapshot
-			margin_used = trade_amount_usdt
-			snap = models.BalanceSnapshot(
-				total_wallet_balance=balance_after + margin_used,
-				available_balance=balance_after,
-				used_allocation_usd=margin_used,
-				note=f"[{endpoint_label}] Trade: {symbol} {side} qty={order_qty} margin={margin_used:.2f} USDT",
-			)
-			db.add(snap)
-			db.commit()
-			
-			# ===== BAŞARI KONTROLÜ: Binance Order ID var mı? =====
-			binance_order_id = order.binance_order_id
+					except Exception:
+						extra = e.response.text
+						raise
+				else:
+					_log_binance_call(db, "POST", "/fapi/v1/marginType", client, error=str(e))
 			
-			if binance_order_id and binance_order_id != "None":
-				# Başarılı - Binance Order ID geldi
-				update_webhook_status("completed")
-				return {
-					"success": True,
-					"order_id": binance_order_id,
-					"response": order_response,
-					"error": None,
-				}
-			elif settings.dry_run:
-				# DRY_RUN modunda Order ID gelmez, yine de başarılı sayılır
-				update_webhook_status("completed")
-				return {
-					"success": True,
-					"order_id": None,
-					"response": order_response,
-					"error": None,
-				}
-			else:
-				# Binance Order ID gelmedi - başarısız
+			try:
+				order_response = await client.place_market_order(symbol, side, order_qty, position_side=position_side)
+				_log_binance_call(db, "POST", "/fapi/v1/order", client, response_data=order_response)
+			except Exception as e:
+				extra = None
+				if isinstance(e, httpx.HTTPStatusError):
+					try:
+						extra = e.response.json()
+					except Exception:
+						extra = e.response.text
+				invalidate_on_invalid_symbol(client, e)
+				err_msg = f"Emir başarısız: {e}" + (f" | Binance: {extra}" if extra else "")
+				_log_binance_call(db, "POST", "/fapi/v1/order", client, error=err_msg)
 				update_webhook_status("failed")
 				return {
 					"success": False,
+					"error": err_msg,
 					"order_id": None,
-					"response": order_response,
-					"error": "Binance Order ID alınamadı",
+					"response": None,
 				}
+		
+		# ===== DB'DE POZİSYON MİKTARINI GÜNCELLE =====
+		update_endpoint_position(db, endpoint, symbol, new_position_side, order_qty, current_price)
+		
+		# Save order record
+		order = models.OrderRecord(
+			endpoint=endpoint,
+			symbol=symbol,
+			side=side,
+			position_side=position_side,
+			leverage=leverage,
+			qty=order_qty,
+			price=current_price,
+			status=str(order_response.get("status", "NEW")),
+			binance_order_id=str(order_response.get("orderId")) if order_response.get("orderId") is not None else None,
+			response=order_response,
+		)
+		db.add(order)
+		
+		# Balance after
+		balance_after = balance_before
+		if settings.binance_api_key and settings.binance_api_secret and not settings.dry_run:
+			try:
+				acct_after = await client.account_usdt_balances()
+				_log_binance_call(db, "GET", "/fapi/v2/balance (after)", client, response_data=acct_after)
+				balance_after = acct_after.get("available", balance_before)
+			except Exception as e:
+				_log_binance_call(db, "GET", "/fapi/v2/balance (after)", client, error=str(e))
+		
+		# Balance snapshot
+		margin_used = trade_amount_usdt
+		snap = models.BalanceSnapshot(
+			total_wallet_balance=balance_after + margin_used,
+			available_balance=balance_after,
+			used_allocation_usd=margin_used,
+			note=f"[{endpoint_label}] Trade: {symbol} {side} qty={order_qty} margin={margin_used:.2f} USDT",
+		)
+		db.add(snap)
+		db.commit()
+		
+		# ===== BAŞARI KONTROLÜ: Binance Order ID var mı? =====
+		binance_order_id = order.binance_order_id
+		
+		if binance_order_id and binance_order_id != "None":
+			# Başarılı - Binance Order ID geldi
+			update_webhook_status("completed")
+			return {
+				"success": True,
+				"order_id": binance_order_id,
+				"response": order_response,
+				"error": None,
+			}
+		elif settings.dry_run:
+			# DRY_RUN modunda Order ID gelmez, yine de başarılı sayılır
+			update_webhook_status("completed")
+			return {
+				"success": True,
+				"order_id": None,
+				"response": order_response,
+				"error": None,
+			}
+		else:
+			# Binance Order ID gelmedi - başarısız
+			update_webhook_status("failed")
+			return {
+				"success": False,
+				"order_id": None,
+				"response": order_response,
+				"error": "Binance Order ID alınamadı",
+			}
 	finally:
 		await notifier.close()
 		db.close()
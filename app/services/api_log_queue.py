@@ -0,0 +1,92 @@
+import asyncio
+from typing import Optional, Dict, Any, List
+from sqlalchemy import insert
+from ..database import AsyncSessionLocal
+from .. import models
+
+
+# Flusher'a "dur" sinyali: eldeki batch yazıldıktan sonra döngü normal şekilde biter
+_STOP = object()
+
+
+class ApiLogBatcher:
+	"""Binance API log satırlarını queue'da toplayıp toplu INSERT ile DB'ye yazan servis."""
+
+	def __init__(self, max_batch: int = 200, flush_interval: float = 0.5):
+		self.max_batch = max_batch
+		self.flush_interval = flush_interval
+		self.queue: asyncio.Queue = asyncio.Queue()
+		self.running = False
+		self._task: Optional[asyncio.Task] = None
+
+	def enqueue(self, row: Dict[str, Any]) -> None:
+		"""Log satırını beklemeden queue'ya ekle (commit flusher'da yapılır)."""
+		self.queue.put_nowait(row)
+
+	async def start(self):
+		"""Flusher'ı başlat."""
+		if self.running:
+			return
+		self.running = True
+		self._task = asyncio.create_task(self._flush_loop())
+		print("[ApiLogBatcher] Flusher başlatıldı")
+
+	async def stop(self):
+		"""Flusher'ı durdur ve queue'da kalanları yaz."""
+		self.running = False
+		if self._task:
+			# Cancel yerine sentinel: yazılmakta olan batch kaybolmaz
+			self.queue.put_nowait(_STOP)
+			try:
+				await self._task
+			except Exception as e:
+				print(f"[ApiLogBatcher] Flusher durdurma hatası: {e}")
+			self._task = None
+		await self._write(self._drain())
+		print("[ApiLogBatcher] Flusher durduruldu")
+
+	def _drain(self) -> List[Dict[str, Any]]:
+		batch: List[Dict[str, Any]] = []
+		while not self.queue.empty():
+			row = self.queue.get_nowait()
+			if row is not _STOP:
+				batch.append(row)
+		return batch
+
+	async def _flush_loop(self):
+		loop = asyncio.get_running_loop()
+		stopping = False
+		while not stopping:
+			row = await self.queue.get()
+			if row is _STOP:
+				break
+			batch = [row]
+			# İlk satırdan sonra en fazla flush_interval kadar ya da max_batch dolana kadar topla
+			deadline = loop.time() + self.flush_interval
+			while len(batch) < self.max_batch:
+				timeout = deadline - loop.time()
+				if timeout <= 0:
+					break
+				try:
+					row = await asyncio.wait_for(self.queue.get(), timeout)
+				except asyncio.TimeoutError:
+					break
+				if row is _STOP:
+					stopping = True
+					break
+				batch.append(row)
+			await self._write(batch)
+
+	async def _write(self, batch: List[Dict[str, Any]]) -> None:
+		if not batch:
+			return
+		try:
+			async with AsyncSessionLocal() as session:
+				await session.execute(insert(models.BinanceAPILog), batch)
+				await session.commit()
+		except Exception as e:
+			print(f"[ApiLogBatcher] DB yazma hatası ({len(batch)} satır): {e}")
+
+
+# Global instance
+api_log_batcher = ApiLogBatcher()
@@ -0,0 +1,168 @@
+import asyncio
+import time
+import httpx
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from .binance_client import BinanceFuturesClient
+from .order_sizing import build_filters_index
+
+
+class TTLCache:
+	"""Küçük in-memory TTL cache (process başına; değerler ttl saniye sonra bayatlar).
+
+	maxsize verilirse en az kullanılan (LRU) kayıt atılarak boyut sınırlanır.
+	"""
+
+	def __init__(self, ttl: float, maxsize: Optional[int] = None):
+		self.ttl = ttl
+		self.maxsize = maxsize
+		self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+		self._lock = asyncio.Lock()
+
+	def get(self, key: Hashable) -> Optional[Any]:
+		item = self._data.get(key)
+		if item is None:
+			return None
+		expires_at, value = item
+		if time.monotonic() >= expires_at:
+			self._data.pop(key, None)
+			return None
+		self._data.move_to_end(key)
+		return value
+
+	def set(self, key: Hashable, value: Any) -> None:
+		self._data[key] = (time.monotonic() + self.ttl, value)
+		self._data.move_to_end(key)
+		if self.maxsize is not None and len(self._data) > self.maxsize:
+			self._data.popitem(last=False)
+
+	def invalidate(self, key: Optional[Hashable] = None) -> None:
+		if key is None:
+			self._data.clear()
+		else:
+			self._data.pop(key, None)
+
+
+# exchangeInfo nadiren değişir; position mode yalnızca admin işlemiyle değişir
+exchange_info_cache = TTLCache(ttl=300)
+position_mode_cache = TTLCache(ttl=3600)
+# Frontend fiyat polling'i: aynı sembol için eş zamanlı istekler tek upstream çağrısında birleşir.
+# Sembol istemciden geldiği için cache boyutu sınırlı; kilitler yalnızca kullanan/bekleyen varken tutulur.
+price_cache = TTLCache(ttl=1.0, maxsize=256)
+
+
+class _RefLock:
+	"""Kullanan + bekleyen sayısını tutan kilit; sayı sıfıra inince sözlükten silinir."""
+	__slots__ = ("lock", "refs")
+
+	def __init__(self):
+		self.lock = asyncio.Lock()
+		self.refs = 0
+
+
+_price_locks: Dict[Hashable, _RefLock] = {}
+# Bilinmeyen sembol için exchangeInfo en fazla bu aralıkla yeniden çekilir (hatalı/delist sembol akışı cache'i delmesin)
+_UNKNOWN_SYMBOL_REFRESH_INTERVAL = 60.0
+_unknown_symbol_refreshed_at: Dict[str, float] = {}
+
+
+# Cache miss'te gerçek fetch sonucu ile çağrılır (ör. API log); cache hit'te çağrılmaz
+OnFetch = Optional[Callable[[Any], None]]
+
+
+async def _cached_exchange(client: BinanceFuturesClient, on_fetch: OnFetch = None) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+	"""(exchangeInfo, symbol->filtreler index'i) çiftini base_url başına cache'le (testnet/live ayrı)."""
+	key = client.base_url
+	value = exchange_info_cache.get(key)
+	if value is not None:
+		return value
+	async with exchange_info_cache._lock:
+		# Aynı anda gelen istekler tek bir fetch'i paylaşır
+		value = exchange_info_cache.get(key)
+		if value is None:
+			ex_info = await client.exchange_info()
+			value = (ex_info, build_filters_index(ex_info))
+			exchange_info_cache.set(key, value)
+			if on_fetch is not None:
+				on_fetch(ex_info)
+	return value
+
+
+async def cached_exchange_info(client: BinanceFuturesClient, on_fetch: OnFetch = None) -> Dict[str, Any]:
+	ex_info, _ = await _cached_exchange(client, on_fetch)
+	return ex_info
+
+
+async def cached_symbol_filters(client: BinanceFuturesClient, symbol: str, on_fetch: OnFetch = None) -> Dict[str, Any]:
+	"""get_symbol_filters ile aynı sonuç; lineer tarama yerine index'ten okur."""
+	_, index = await _cached_exchange(client, on_fetch)
+	filters = index.get(symbol)
+	if filters is None:
+		# Yeni listelenen sembol olabilir: cache'i tazele (base_url başına en fazla dakikada bir)
+		now = time.monotonic()
+		last = _unknown_symbol_refreshed_at.get(client.base_url)
+		if last is None or now - last >= _UNKNOWN_SYMBOL_REFRESH_INTERVAL:
+			_unknown_symbol_refreshed_at[client.base_url] = now
+			exchange_info_cache.invalidate(client.base_url)
+			_, index = await _cached_exchange(client, on_fetch)
+			filters = index.get(symbol)
+	if filters is None:
+		raise ValueError(f"Symbol not found in exchangeInfo: {symbol}")
+	return filters
+
+
+def invalidate_on_invalid_symbol(client: BinanceFuturesClient, exc: Exception) -> None:
+	"""Binance -1121 (Invalid symbol) dönerse exchangeInfo cache'ini düşür; sonraki istek taze veri çeker."""
+	if not isinstance(exc, httpx.HTTPStatusError):
+		return
+	try:
+		code = exc.response.json().get("code")
+	except Exception:
+		return
+	if code == -1121:
+		exchange_info_cache.invalidate(client.base_url)
+
+
+async def cached_position_mode(client: BinanceFuturesClient, on_fetch: OnFetch = None) -> Dict[str, Any]:
+	"""positionSide/dual sonucunu hesap (API key) başına cache'le."""
+	key = (client.base_url, client.api_key)
+	value = position_mode_cache.get(key)
+	if value is not None:
+		return value
+	async with position_mode_cache._lock:
+		value = position_mode_cache.get(key)
+		if value is None:
+			value = await client.position_mode()
+			position_mode_cache.set(key, value)
+			if on_fetch is not None:
+				on_fetch(value)
+	return value
+
+
+def remember_position_mode(client: BinanceFuturesClient, dual: bool) -> None:
+	"""set_position_mode başarılı olunca yeni modu doğrudan cache'e yaz (tekrar sorgulamaya gerek yok)."""
+	position_mode_cache.set((client.base_url, client.api_key), {"dualSidePosition": dual})
+
+
+async def cached_ticker_price(client: BinanceFuturesClient, symbol: str) -> float:
+	"""Sembol başına ~1 sn cache'lenmiş fiyat; kilit sembol bazında (farklı semboller birbirini beklemez)."""
+	key = (client.base_url, symbol)
+	value = price_cache.get(key)
+	if value is not None:
+		return value
+	entry = _price_locks.get(key)
+	if entry is None:
+		entry = _price_locks[key] = _RefLock()
+	entry.refs += 1
+	try:
+		async with entry.lock:
+			value = price_cache.get(key)
+			if value is None:
+				value = await client.ticker_price(symbol)
+				price_cache.set(key, value)
+	finally:
+		# Son kullanan çıkınca kilidi sil (geçersiz/tek seferlik semboller birikmez)
+		entry.refs -= 1
+		if entry.refs == 0:
+			del _price_locks[key]
+	return value
@@ -1,4 +1,6 @@
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Tuple
+from contextvars import ContextVar
+import importlib.util
 import time
 import hmac
 import hashlib
@@ -6,16 +8,35 @@ from urllib.parse import urlencode
 import httpx
 
 
+# HTTP/2 için h2 paketi gerekir (httpx[http2]); yoksa HTTP/1.1 keep-alive ile devam
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Paylaşılan client'ta çağrılar eş zamanlı: son request bilgisi instance'ta değil task context'inde tutulur
+# (her asyncio task kendi kopyasını görür; başka bir isteğin URL/status'u log'a karışmaz)
+_last_request_debug: ContextVar[Optional[Dict[str, Any]]] = ContextVar("binance_last_request_debug", default=None)
+_last_status_code: ContextVar[Optional[int]] = ContextVar("binance_last_status_code", default=None)
+
+# Saat farkı periyodik olarak (ve -1021 gelince hemen) yeniden senkronlanır
+_TIME_SYNC_INTERVAL = 1800.0
+_TIME_SYNC_RETRY = 60.0
+_TIMESTAMP_ERROR_CODE = -1021
+
+
 class BinanceFuturesClient:
 	def __init__(self, api_key: str, api_secret: str, base_url: str):
 		self.api_key = api_key
 		self.api_secret = api_secret  # Keep as string, encode when needed
 		self.base_url = base_url.rstrip("/")
-		self._client = httpx.AsyncClient(base_url=self.base_url, timeout=20.0)
-		self._last_request_debug = None
-		self._last_status_code: Optional[int] = None
+		# Uzun ömürlü paylaşılan kullanım için keep-alive havuzu
+		self._client = httpx.AsyncClient(
+			base_url=self.base_url,
+			timeout=20.0,
+			limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+			# Paralel çağrılar tek bağlantı üzerinde multiplex edilir; gzip yanıtları httpx kendisi açar
+			http2=_HTTP2,
+		)
 		self._time_offset_ms: int = 0
-		self._time_synced: bool = False
+		self._time_sync_due: float = 0.0  # time.monotonic(); bu andan sonra yeniden senkronla
 
 	async def close(self):
 		await self._client.aclose()
@@ -36,32 +57,15 @@ class BinanceFuturesClient:
 		query = urlencode(params, doseq=True)
 		return hmac.new(self.api_secret.encode('utf-8'), query.encode('utf-8'), hashlib.sha256).hexdigest()
 
-	async def _signed_get(self, path: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
-		params = params.copy() if params else {}
-		await self._ensure_time_sync()
-		params.setdefault("timestamp", self._timestamp())
-		params.setdefault("recvWindow", 10000)
-		sig = self._sign(params)
-		params["signature"] = sig
-		
-		# Debug bilgilerini sakla (headerları maskele)
-		full_url = f"{self.base_url}{path}"
-		query_string = urlencode({k: v for k, v in params.items() if k != 'signature'}, doseq=True)
-		self._last_request_debug = {
-			"url": full_url,
-			"headers": {"X-MBX-APIKEY": "***"},
-			"params": {**params, "signature": "***"},
-			"signature": "***",
-			"api_secret": "***",
-			"query_string": query_string,
-			"signature_input": query_string
-		}
-		
-		resp = await self._client.get(path, params=params, headers=self._headers())
-		self._last_status_code = resp.status_code
+	async def _signed_request(self, method: str, path: str, params: Optional[Dict[str, Any]]) -> httpx.Response:
+		resp = await self._send_signed(method, path, params)
+		if self._is_timestamp_error(resp):
+			# Saat kaymış (-1021): offset'i hemen tazele ve bir kez tekrar dene (istek Binance'te reddedildi)
+			self._time_sync_due = 0.0
+			resp = await self._send_signed(method, path, params)
 		return resp
 
-	async def _signed_post(self, path: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+	async def _send_signed(self, method: str, path: str, params: Optional[Dict[str, Any]]) -> httpx.Response:
 		params = params.copy() if params else {}
 		await self._ensure_time_sync()
 		params.setdefault("timestamp", self._timestamp())
@@ -72,7 +76,7 @@ class BinanceFuturesClient:
 		# Debug bilgilerini sakla (headerları maskele)
 		full_url = f"{self.base_url}{path}"
 		query_string = urlencode({k: v for k, v in params.items() if k != 'signature'}, doseq=True)
-		self._last_request_debug = {
+		_last_request_debug.set({
 			"url": full_url,
 			"headers": {"X-MBX-APIKEY": "***"},
 			"params": {**params, "signature": "***"},
@@ -80,43 +84,63 @@ class BinanceFuturesClient:
 			"api_secret": "***",
 			"query_string": query_string,
 			"signature_input": query_string
-		}
+		})
 		
-		resp = await self._client.post(path, data=params, headers=self._headers())
-		self._last_status_code = resp.status_code
+		if method == "GET":
+			resp = await self._client.get(path, params=params, headers=self._headers())
+		else:
+			resp = await self._client.post(path, data=params, headers=self._headers())
+		_last_status_code.set(resp.status_code)
 		return resp
 
+	@staticmethod
+	def _is_timestamp_error(resp: httpx.Response) -> bool:
+		if resp.status_code != 400:
+			return False
+		try:
+			return resp.json().get("code") == _TIMESTAMP_ERROR_CODE
+		except Exception:
+			return False
+
+	async def _signed_get(self, path: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+		return await self._signed_request("GET", path, params)
+
+	async def _signed_post(self, path: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+		return await self._signed_request("POST", path, params)
+
 	async def test_connectivity(self) -> Dict[str, Any]:
 		resp = await self._client.get("/fapi/v1/ping")
-		self._last_status_code = resp.status_code
+		_last_status_code.set(resp.status_code)
 		resp.raise_for_status()
 		return resp.json() if resp.text else {}
 
 	async def server_time(self) -> int:
 		"""Return server time in milliseconds."""
 		resp = await self._client.get("/fapi/v1/time")
-		self._last_status_code = resp.status_code
+		_last_status_code.set(resp.status_code)
 		resp.raise_for_status()
 		data = resp.json()
 		return int(data.get("serverTime", 0))
 
 	async def _ensure_time_sync(self) -> None:
-		"""Sync local offset to Binance server time once to avoid timestamp 400s."""
-		if self._time_synced:
+		"""Sync local offset to Binance server time periodically to avoid timestamp 400s."""
+		now = time.monotonic()
+		if now < self._time_sync_due:
 			return
+		# Eş zamanlı çağrılar aynı anda senkron denemesin; başarısızlıkta kısa süre sonra tekrar denenir
+		self._time_sync_due = now + _TIME_SYNC_RETRY
 		try:
 			server_ts = await self.server_time()
 			local_ts = int(time.time() * 1000)
 			self._time_offset_ms = server_ts - local_ts
-			self._time_synced = True
+			self._time_sync_due = time.monotonic() + _TIME_SYNC_INTERVAL
 		except Exception:
-			# If server time fetch fails, continue without sync
-			self._time_offset_ms = 0
-			self._time_synced = True
+			# If server time fetch fails, keep the previous offset and retry later
+			pass
 
 	async def exchange_info(self) -> Dict[str, Any]:
 		resp = await self._client.get("/fapi/v1/exchangeInfo")
-		self._last_status_code = resp.status_code
+		_last_status_code.set(resp.status_code)
 		resp.raise_for_status()
 		return resp.json()
 
@@ -124,7 +148,7 @@ class BinanceFuturesClient:
 		"""Return wallet and available USDT balances for USDT-M futures."""
 		try:
 			resp = await self._signed_get("/fapi/v2/balance")
-			self._last_status_code = resp.status_code
+			_last_status_code.set(resp.status_code)
 			resp.raise_for_status()
 			assets = resp.json()
 			for a in assets:
@@ -138,7 +162,7 @@ class BinanceFuturesClient:
 		except httpx.HTTPStatusError:
 			# Some Testnet environments return 400 for v2; fallback to v3
 			resp2 = await self._signed_get("/fapi/v3/account")
-			self._last_status_code = resp2.status_code
+			_last_status_code.set(resp2.status_code)
 			resp2.raise_for_status()
 			data = resp2.json()
 			assets = data.get("assets") or []
@@ -221,17 +245,17 @@ class BinanceFuturesClient:
 		return data
 
 	def get_last_request_debug(self) -> Optional[Dict[str, Any]]:
-		"""Son request'in debug bilgilerini döndür (maskeleme uygulanmış)"""
-		return self._last_request_debug
+		"""Bu task'taki son request'in debug bilgilerini döndür (maskeleme uygulanmış)"""
+		return _last_request_debug.get()
 
 	def get_last_status_code(self) -> Optional[int]:
-		return self._last_status_code
+		return _last_status_code.get()
 
 	# Yeni: halka açık fiyat (ticker) endpointi
 	async def ticker_price(self, symbol: str) -> float:
 		"""Return latest price for a symbol from /fapi/v1/ticker/price"""
 		resp = await self._client.get("/fapi/v1/ticker/price", params={"symbol": symbol})
-		self._last_status_code = resp.status_code
+		_last_status_code.set(resp.status_code)
 		resp.raise_for_status()
 		data = resp.json()
 		price_val = data.get("price")
@@ -239,3 +263,28 @@ class BinanceFuturesClient:
 			return float(price_val)
 		except Exception:
 			return 0.0
+
+
+# (api_key, api_secret, base_url) başına process-wide client: TCP/TLS keep-alive havuzu istekler arasında korunur
+_shared_clients: Dict[Tuple[str, str, str], BinanceFuturesClient] = {}
+
+
+def get_shared_client(api_key: str, api_secret: str, base_url: str) -> BinanceFuturesClient:
+	"""Paylaşılan client'ı döndür; `async with` ile kullanılmamalı (kapanışı close_shared_clients yapar)."""
+	key = (api_key or "", api_secret or "", base_url.rstrip("/"))
+	client = _shared_clients.get(key)
+	if client is None or client._client.is_closed:
+		client = BinanceFuturesClient(*key)
+		_shared_clients[key] = client
+	return client
+
+
+async def close_shared_clients() -> None:
+	"""Shutdown'da tüm paylaşılan client'ların bağlantı havuzlarını kapat."""
+	clients = list(_shared_clients.values())
+	_shared_clients.clear()
+	for client in clients:
+		try:
+			await client.close()
+		except Exception as e:
+			print(f"[BinanceClient] Kapatma hatası: {e}")
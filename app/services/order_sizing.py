@@ -2,15 +2,28 @@ from typing import Dict, Any, Tuple
 import math
 
 
+def _parse_symbol_filters(symbol_info: Dict[str, Any]) -> Dict[str, Any]:
+	filters = {f["filterType"]: f for f in symbol_info.get("filters", [])}
+	return {
+		"minQty": float(filters.get("LOT_SIZE", {}).get("minQty", 0.0)),
+		"stepSize": float(filters.get("LOT_SIZE", {}).get("stepSize", 0.0)),
+		"tickSize": float(filters.get("PRICE_FILTER", {}).get("tickSize", 0.0)),
+	}
+
+
+def build_filters_index(exchange_info: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+	"""symbol -> filtreler; exchangeInfo yenilendiğinde bir kez kurulur, emir başına O(1) lookup."""
+	return {
+		s["symbol"]: _parse_symbol_filters(s)
+		for s in exchange_info.get("symbols", [])
+		if s.get("symbol")
+	}
+
+
 def get_symbol_filters(exchange_info: Dict[str, Any], symbol: str) -> Dict[str, Any]:
 	for s in exchange_info.get("symbols", []):
 		if s.get("symbol") == symbol:
-			filters = {f["filterType"]: f for f in s.get("filters", [])}
-			return {
-				"minQty": float(filters.get("LOT_SIZE", {}).get("minQty", 0.0)),
-				"stepSize": float(filters.get("LOT_SIZE", {}).get("stepSize", 0.0)),
-				"tickSize": float(filters.get("PRICE_FILTER", {}).get("tickSize", 0.0)),
-			}
+			return _parse_symbol_filters(s)
 	raise ValueError(f"Symbol not found in exchangeInfo: {symbol}")
 
 
@@ -1,5 +1,54 @@
+import asyncio
 import httpx
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
+
+
+# Fire-and-forget gönderimlerin task referansları (GC tarafından toplanmasınlar)
+_background_tasks: Set[asyncio.Task] = set()
+
+
+class _RateLimiter:
+	"""Basit token bucket: saniyede en fazla `rate` istek (Telegram global limiti ~30 msg/sn)."""
+
+	def __init__(self, rate: float, capacity: Optional[float] = None):
+		self.rate = rate
+		self.capacity = capacity or rate
+		self._tokens = self.capacity
+		self._updated: Optional[float] = None
+		self._lock = asyncio.Lock()
+
+	async def acquire(self) -> None:
+		async with self._lock:
+			loop = asyncio.get_running_loop()
+			while True:
+				now = loop.time()
+				if self._updated is not None:
+					self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+				self._updated = now
+				if self._tokens >= 1:
+					self._tokens -= 1
+					return
+				await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+_rate_limiter = _RateLimiter(rate=30)
+# 429 (Too Many Requests) alındığında retry_after kadar bekleyip yeniden dene
+_MAX_ATTEMPTS = 3
+
+# send_message_nowait kuyruğu: tek worker sırayı korur, çağıran beklemez
+_send_queue: Optional["asyncio.Queue[Tuple[TelegramNotifier, str]]"] = None
+_send_worker: Optional[asyncio.Task] = None
+
+
+async def _send_loop(queue: "asyncio.Queue[Tuple[TelegramNotifier, str]]") -> None:
+	while True:
+		notifier, text = await queue.get()
+		try:
+			await notifier.send_message(text)
+		except Exception as e:
+			print(f"[Telegram] Kuyruk gönderim hatası: {e}")
+		finally:
+			queue.task_done()
 
 
 class TelegramNotifier:
@@ -15,7 +64,11 @@ class TelegramNotifier:
 	async def _get_client(self) -> httpx.AsyncClient:
 		"""Lazy initialization ile client döndür."""
 		if self._client is None or self._client.is_closed:
-			self._client = httpx.AsyncClient(timeout=30.0)
+			# Uzun ömürlü notifier: az sayıda keep-alive bağlantı yeterli
+			self._client = httpx.AsyncClient(
+				timeout=30.0,
+				limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60),
+			)
 		return self._client
 	
 	async def close(self):
@@ -24,6 +77,26 @@ class TelegramNotifier:
 			await self._client.aclose()
 			self._client = None
 
+	async def _post(self, method: str, **kwargs) -> httpx.Response:
+		"""Rate limit'e uyarak POST at; 429'da Telegram'ın retry_after süresine uy."""
+		client = await self._get_client()
+		for attempt in range(_MAX_ATTEMPTS):
+			await _rate_limiter.acquire()
+			resp = await client.post(f"{self.base_url}/{method}", **kwargs)
+			if resp.status_code != 429 or attempt == _MAX_ATTEMPTS - 1:
+				return resp
+			try:
+				retry_after = float(resp.json().get("parameters", {}).get("retry_after", 1))
+			except Exception:
+				retry_after = 1.0
+			print(f"[Telegram] 429 alındı, {retry_after}s sonra tekrar denenecek")
+			await asyncio.sleep(retry_after)
+			# Dosya gönderimlerinde aynı içerik baştan okunmalı
+			for _, f in (kwargs.get("files") or {}).items():
+				if hasattr(f[1], "seek"):
+					f[1].seek(0)
+		return resp
+
 	async def get_updates(self, offset: int = None, timeout: int = 1) -> List[Dict[str, Any]]:
 		"""
 		Telegram'dan yeni güncellemeleri çeker (long polling).
@@ -78,9 +151,8 @@ class TelegramNotifier:
 				"inline_keyboard": keyboard
 			}
 			
-			client = await self._get_client()
-			resp = await client.post(
-				f"{self.base_url}/sendMessage",
+			resp = await self._post(
+				"sendMessage",
 				json={
 					"chat_id": target_chat,
 					"text": text,
@@ -176,9 +248,8 @@ class TelegramNotifier:
 		try:
 			print(f"[Telegram] Mesaj gönderiliyor: {text[:50]}...")
 			print(f"[Telegram] Chat ID: {self.chat_id}")
-			client = await self._get_client()
-			resp = await client.post(
-				f"{self.base_url}/sendMessage",
+			resp = await self._post(
+				"sendMessage",
 				json={"chat_id": self.chat_id, "text": text, "parse_mode": "HTML"},
 				timeout=15.0
 			)
@@ -196,10 +267,25 @@ class TelegramNotifier:
 			print(f"[Telegram] Hata: {self.last_error}")
 			return None
 
-	async def send_photo(self, photo_file, caption: str = None) -> Optional[dict]:
+	def send_message_nowait(self, text: str) -> None:
+		"""
+		Mesajı gönderim kuyruğuna ekler; çağıran Telegram round-trip'ini beklemez.
+		Kuyruk tek worker ile sırayla ve rate limit'e uyarak boşaltılır.
+		"""
+		global _send_queue, _send_worker
+		if _send_queue is None:
+			_send_queue = asyncio.Queue()
+		if _send_worker is None or _send_worker.done():
+			_send_worker = asyncio.create_task(_send_loop(_send_queue))
+			_background_tasks.add(_send_worker)
+			_send_worker.add_done_callback(_background_tasks.discard)
+		_send_queue.put_nowait((self, text))
+
+	async def send_photo(self, photo_file, caption: str = None, filename: str = "chart.png", mime_type: str = "image/png") -> Optional[dict]:
 		"""
 		Sends a photo to Telegram.
 		photo_file: binary file-like object (e.g. io.BytesIO)
+		filename/mime_type: yüklenen dosyanın adı ve tipi (ör. JPEG için "chart.jpg", "image/jpeg")
 		"""
 		if not self.bot_token or not self.chat_id:
 			self.last_error = "Bot token veya chat ID boş"
@@ -207,15 +293,14 @@ class TelegramNotifier:
 		
 		try:
 			print(f"[Telegram] Fotoğraf gönderiliyor...")
-			client = await self._get_client()
-			files = {'photo': ('chart.png', photo_file, 'image/png')}
+			files = {'photo': (filename, photo_file, mime_type)}
 			data = {'chat_id': self.chat_id}
 			if caption:
 				data['caption'] = caption
 				data['parse_mode'] = 'HTML'
 			
-			resp = await client.post(
-				f"{self.base_url}/sendPhoto",
+			resp = await self._post(
+				"sendPhoto",
 				data=data,
 				files=files,
 				timeout=30.0
@@ -8,6 +8,7 @@ import io
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
+from sqlalchemy import select
 
 from .telegram import TelegramNotifier
 from ..config import get_settings
@@ -301,7 +302,11 @@ class TelegramCommandHandler:
 					print(f"[TelegramCommandHandler] Binance veri çekme hatası: {e}")
 			
 			# Snapshot'tan veri çek
-			last_snap = db.query(models.BalanceSnapshot).order_by(models.BalanceSnapshot.id.desc()).first()
+			# ORM nesnesi yerine yalnızca gereken kolonlar (LIMIT 1)
+			Snap = models.BalanceSnapshot
+			last_snap = db.execute(
+				select(Snap.total_wallet_balance, Snap.used_allocation_usd).order_by(Snap.id.desc()).limit(1)
+			).one_or_none()
 			used = last_snap.used_allocation_usd if last_snap else 0.0
 			
 			if wallet == 0.0 and last_snap:
@@ -310,8 +315,8 @@ class TelegramCommandHandler:
 				available = wallet - used
 			
 			# PnL hesapla
-			first_snap = db.query(models.BalanceSnapshot).order_by(models.BalanceSnapshot.id.asc()).first()
-			pnl_total = (wallet - first_snap.total_wallet_balance) if first_snap else 0.0
+			first_bal = db.execute(select(Snap.total_wallet_balance).order_by(Snap.id.asc()).limit(1)).scalar()
+			pnl_total = (wallet - first_bal) if first_bal is not None else 0.0
 			pnl_1h = (wallet - last_snap.total_wallet_balance) if last_snap else 0.0
 			
 			# ========== LAYER BAZLI POZİSYON ANALİZİ ==========
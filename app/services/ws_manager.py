@@ -1,4 +1,6 @@
+import asyncio
 from typing import List
+import orjson
 from fastapi import WebSocket
 
 
@@ -15,14 +17,23 @@ class WSManager:
 			self.active.remove(ws)
 
 	async def broadcast_json(self, data) -> None:
-		dead = []
-		for ws in self.active:
-			try:
-				await ws.send_json(data)
-			except Exception:
-				dead.append(ws)
-		for ws in dead:
-			self.disconnect(ws)
+		# Mesaj bir kez serialize edilir; tüm client'lara aynı frame gider
+		try:
+			# Decimal vb. orjson'un tanımadığı tipler str'e çevrilir; serialize hatası çağırana taşmaz
+			text = orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+		except Exception as e:
+			print(f"[WSManager] Broadcast serialize hatası: {e}")
+			return
+		await self.broadcast_text(text)
+
+	async def broadcast_text(self, text: str) -> None:
+		"""Önceden serialize edilmiş mesajı gönder (text frame: tarayıcı JSON.parse ile okur)."""
+		# Yavaş bir client diğerlerini sıraya sokmasın diye gönderimler paralel
+		clients = list(self.active)
+		results = await asyncio.gather(*(ws.send_text(text) for ws in clients), return_exceptions=True)
+		for ws, result in zip(clients, results):
+			if isinstance(result, Exception):
+				self.disconnect(ws)
 
 
 ws_manager = WSManager()
@@ -16,7 +16,8 @@ class RuntimeConfigStore:
 	def reset_from_settings(self, settings: Settings) -> None:
 		self.leverage_policy = settings.leverage_policy
 		self.default_leverage = settings.default_leverage
-		self.leverage_per_symbol = settings.leverage_map()
+		# Settings'teki map salt-okunur; runtime değiştirilebilir (ve JSON'a yazılabilir) kopya tutar
+		self.leverage_per_symbol = dict(settings.leverage_map())
 		# Initialize new fields from settings defaults
 		self.allocation_cap_usd = None  # Varsayılan olarak .env'den sabit bir USD limit yok
 		self.per_trade_pct = settings.per_trade_pct
@@ -5,6 +5,7 @@ Database migration script: Yeni kolonları ve tabloları ekler.
 - OrderRecord tablosuna endpoint kolonu
 - EndpointPosition tablosu
 - EndpointConfig tablosu
+- LayerSnapshot (endpoint, created_at) bileşik index'i
 """
 import sqlite3
 import sys
@@ -108,6 +109,13 @@ def migrate():
         else:
             print("  ✓ 'endpoint_positions' table already exists")
         
+        # Bileşik index (endpoint + symbol ile pozisyon arama)
+        try:
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_endpoint_positions_endpoint_symbol ON endpoint_positions (endpoint, symbol)")
+            print("  ✓ Index on '(endpoint, symbol)' created/exists")
+        except sqlite3.OperationalError:
+            pass
+        
         # ===== ENDPOINT_CONFIGS TABLOSU =====
         print("\n[endpoint_configs table]")
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='endpoint_configs'")
@@ -151,6 +159,13 @@ def migrate():
         else:
             print("  ✓ 'layer_snapshots' table already exists")
         
+        # Bileşik index (grafik sorgusu: endpoint + created_at aralığı)
+        try:
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_layer_snapshots_endpoint_created_at ON layer_snapshots (endpoint, created_at)")
+            print("  ✓ Index on '(endpoint, created_at)' created/exists")
+        except sqlite3.OperationalError:
+            pass
+        
         conn.commit()
         conn.close()
         
@@ -6,6 +6,7 @@ Bu script aynı anda FastAPI backend'i (uvicorn) ve Streamlit frontend'i başlat
 Render deployment için tek servis mimaride tüm özellikler aktif olur.
 """
 
+import importlib.util
 import os
 import subprocess
 import sys
@@ -28,7 +29,12 @@ def start_streamlit_bg():
 def start_backend_foreground():
     """FastAPI backend'i public PORT üzerinde başlat (uvicorn)"""
     port = os.getenv("PORT", "8000")
-    print(f"🧠 FastAPI backend (public) başlatılıyor - Port: {port}")
+    # uvloop/httptools uvicorn[standard] ile gelir (Windows'ta uvloop yok -> asyncio)
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    # Tek worker: webhook queue'ları, API log batcher ve scheduler process içi;
+    # birden fazla worker saatlik raporu çoğaltır ve queue'ları böler
+    print(f"🧠 FastAPI backend (public) başlatılıyor - Port: {port} (loop={loop}, http={http})")
     subprocess.run([
         sys.executable,
         "-m",
@@ -36,6 +42,8 @@ def start_backend_foreground():
         "app.main:app",
         "--host", "0.0.0.0",
         "--port", port,
+        "--loop", loop,
+        "--http", http,
     ])
 
 if __name__ == "__main__":